@@ -1,24 +1,46 @@
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 
-from src.auth.exceptions import APIKeyException, JWTException, UnauthorizedException
+from src.auth.exceptions import APIKeyException, JWTException, UnauthorizedException, ServiceUnavailableException
 from src.exception_handles import (
     validation_exception_handler, general_exception_handler, api_key_exception_handler,
-    jwt_exception_handler, unauthorized_exception_handler)
+    jwt_exception_handler, unauthorized_exception_handler, service_unavailable_exception_handler)
+
+from configs.database import SQLITE_REPLICA_SYNC_INTERVAL, ReplicaSessionLocals, mark_write, sync_sqlite_replicas
+from src import background
+from src.auth.reaper import TOKEN_REAPER_INTERVAL, run_token_reaper
+from src.archive.services import ARCHIVE_INTERVAL, run_archiver
+from src.user.services import shutdown_hash_executor
 
 from src.permission import routes as permission_routes
 from src.auth import routes as auth_routes
 from src.department import routes as department_routes
 from src.role import routes as role_routes
 from src.user import routes as user_routes
+from src.metrics import routes as metrics_routes
 
 load_dotenv()
 
 DEBUG = bool(int(os.getenv("DEBUG", 1)))
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if TOKEN_REAPER_INTERVAL:
+        background.schedule("token_reaper", TOKEN_REAPER_INTERVAL, run_token_reaper)
+    if ARCHIVE_INTERVAL:
+        background.schedule("archiver", ARCHIVE_INTERVAL, run_archiver)
+    if ReplicaSessionLocals and SQLITE_REPLICA_SYNC_INTERVAL:
+        background.schedule("sqlite_replica_sync", SQLITE_REPLICA_SYNC_INTERVAL, sync_sqlite_replicas)
+    yield
+    await background.cancel_all()
+    shutdown_hash_executor()
+
+
 app = FastAPI(
     title="Fast API Backend",
     description="This is Fast API Backend API Documentation",
@@ -26,6 +48,7 @@ app = FastAPI(
     docs_url="/docs" if DEBUG else None,  # Disable Swagger UI
     redoc_url="/redoc" if DEBUG else None,  # Disable ReDoc
     openapi_url="/openapi.json" if DEBUG else None,  # Disable OpenAPI
+    lifespan=lifespan,
 )
 
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*").split(",")
@@ -38,6 +61,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    # batch-get is a POST only to carry its id list; it does not write
+    if request.method not in ("GET", "HEAD", "OPTIONS") and not request.url.path.endswith("/batch-get"):
+        # Later reads with this token go to the primary until replicas catch up
+        mark_write(request.headers.get("authorization"))
+    return response
+
+
 # Register the custom exception handlers
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
@@ -45,6 +78,8 @@ app.add_exception_handler(APIKeyException, api_key_exception_handler)
 app.add_exception_handler(JWTException, jwt_exception_handler)
 app.add_exception_handler(UnauthorizedException,
                           unauthorized_exception_handler)
+app.add_exception_handler(ServiceUnavailableException,
+                          service_unavailable_exception_handler)
 
 
 # Include routes
@@ -53,6 +88,7 @@ app.include_router(permission_routes.router, prefix="/api/v1")
 app.include_router(department_routes.router, prefix="/api/v1")
 app.include_router(role_routes.router, prefix="/api/v1")
 app.include_router(user_routes.router, prefix="/api/v1")
+app.include_router(metrics_routes.router, prefix="/api/v1")
 
 
 @app.get("/")
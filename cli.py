@@ -1,10 +1,18 @@
+import asyncio
 import secrets
 import argparse
+from datetime import datetime, timedelta
 from fastapi import Depends
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 
-from configs.database import get_db
-from src.auth.utils import hash_password
+from configs.database import get_db, AsyncSessionLocal
+from src.auth.utils import hash_password, hash_api_key, password_pool, ACCESS_TOKEN_EXPIRE_MINUTES
+from src.auth.reaper import reap_user_tokens
+from src.archive.models import ARCHIVE_TABLES
+from src.archive.services import archive_deleted_rows, restore_archived_rows, ARCHIVE_RETENTION_DAYS
+from src.user.services import UserImporter, iter_lines, read_file_chunks, shutdown_hash_executor
 
 from src.auth.models import ApiKey
 from src.department.models import Department
@@ -15,15 +23,30 @@ from src.permission.models import Module, Permission
 def generate_key(db: Session = Depends(get_db)):
     """Generates a new API key."""
     new_key = secrets.token_urlsafe(32)  # Generate a random key
-    api_key = ApiKey(key=new_key)
+    api_key = ApiKey(key_hash=hash_api_key(new_key))  # Only the hash is stored
 
     db.add(api_key)
     db.commit()
     
-    print("API key generated successfully.\nShow? (y/n)")
+    print("API key generated successfully. It cannot be shown again.\nShow? (y/n)")
     show = input().strip().lower()
     if show == "y":
-        print(f"API key: {api_key.key}")
+        print(f"API key: {new_key}")
+
+
+def revoke_key(db: Session = Depends(get_db)):
+    """Deactivates an API key."""
+    key = input("API key: ").strip()
+    api_key = db.scalar(select(ApiKey).where(
+        ApiKey.key_hash == hash_api_key(key), ApiKey.is_active == True))
+    if not api_key:
+        print("No active API key matches.")
+        return
+    api_key.is_active = False
+    api_key.updated_at = datetime.now()  # running servers evict keys by updated_at
+    db.commit()
+
+    print(f"API key revoked: ID={api_key.id}")
 
 
 def create_department(db: Session = Depends(get_db)):
@@ -49,7 +72,7 @@ def create_superuser(db: Session = Depends(get_db)):
     if not name or not email or not phone or not password:
         print("All fields are required.")
         return
-    hashed_password = hash_password(password)
+    hashed_password = password_pool.submit(hash_password, password).result()
 
     user = User(name=name, email=email, phone=phone,
                 password=hashed_password, is_superuser=True)
@@ -86,16 +109,95 @@ def create_permission(db: Session = Depends(get_db)):
     print(f"Permission created: ID={permission.id}, Name={permission.name}")
 
 
+def reap_tokens(db: Session = Depends(get_db), batch_size: int = 1000, dry_run: bool = False):
+    """Deletes expired and blacklisted refresh tokens."""
+    result = reap_user_tokens(
+        db,
+        access_token_lifetime=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+        batch_size=batch_size,
+        dry_run=dry_run,
+    )
+    if dry_run:
+        print(f"{result['rows']} tokens would be deleted.")
+    else:
+        print(f"Deleted {result['rows']} tokens in {result['seconds']}s ({result['rows_per_second']} rows/s).")
+
+
+def import_users(path: str, department_id: int, fmt: str = None, batch_size: int = 1000):
+    """Imports users from an NDJSON or CSV file into a department."""
+    if not path or department_id is None:
+        print("--file and --department-id are required.")
+        return
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            importer = UserImporter(db, department_id, chunk_size=batch_size)
+            return await importer.run(iter_lines(read_file_chunks(path)), fmt)
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        shutdown_hash_executor()
+
+    for error in result["errors"]:
+        print(f"Line {error['line']}: {'; '.join(error['errors'])}")
+    print(f"Imported {result['created']} users, {result['failed']} failed.")
+
+
+def archive_deleted(db: Session = Depends(get_db), batch_size: int = 1000, dry_run: bool = False,
+                    retention_days: int = ARCHIVE_RETENTION_DAYS):
+    """Moves long soft-deleted rows into the archive tables."""
+    result = archive_deleted_rows(
+        db,
+        retention=timedelta(days=retention_days),
+        batch_size=batch_size,
+        dry_run=dry_run,
+    )
+    for table_name, rows in result["rows"].items():
+        print(f"{table_name}: {rows} rows {'would be ' if dry_run else ''}archived")
+
+
+def restore_archived(db: Session = Depends(get_db), table_name: str = None, ids: str = None):
+    """Moves archived rows back into their table."""
+    if table_name not in ARCHIVE_TABLES or not ids:
+        print(f"--table ({', '.join(ARCHIVE_TABLES)}) and --ids are required.")
+        return
+    try:
+        restored = restore_archived_rows(db, table_name, [int(i) for i in ids.split(",")])
+    except IntegrityError as e:
+        db.rollback()
+        print(f"Restore failed, a row conflicts with existing data: {e.orig}")
+        return
+    print(f"Restored {restored} rows into {table_name}.")
+
+
 def main():
     db = next(get_db())
     parser = argparse.ArgumentParser(description="Management Commands")
     parser.add_argument("command", help="Command to run",
-                        choices=["generate_key", "create_department", "create_superuser", "create_module", "create_permission"])
+                        choices=["generate_key", "revoke_key", "create_department", "create_superuser", "create_module", "create_permission",
+                                 "reap_tokens", "import_users", "archive_deleted", "restore_archived"])
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Rows per batch for bulk commands")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report what would change without writing")
+    parser.add_argument("--file", help="Input file for import_users (.csv or NDJSON)")
+    parser.add_argument("--format", choices=["ndjson", "csv"],
+                        help="Input format for import_users; defaults from the file extension")
+    parser.add_argument("--department-id", type=int,
+                        help="Department to import users into")
+    parser.add_argument("--retention-days", type=int, default=ARCHIVE_RETENTION_DAYS,
+                        help="Archive rows soft-deleted more than this many days ago")
+    parser.add_argument("--table", help="Table to restore archived rows into")
+    parser.add_argument("--ids", help="Comma-separated ids of archived rows to restore")
 
     args = parser.parse_args()
 
     if args.command == "generate_key":
         generate_key(db)
+    elif args.command == "revoke_key":
+        revoke_key(db)
     elif args.command == "create_department":
         create_department(db)
     elif args.command == "create_superuser":
@@ -104,6 +206,14 @@ def main():
         create_module(db)
     elif args.command == "create_permission":
         create_permission(db)
+    elif args.command == "reap_tokens":
+        reap_tokens(db, batch_size=args.batch_size, dry_run=args.dry_run)
+    elif args.command == "import_users":
+        import_users(args.file, args.department_id, fmt=args.format, batch_size=args.batch_size)
+    elif args.command == "archive_deleted":
+        archive_deleted(db, batch_size=args.batch_size, dry_run=args.dry_run, retention_days=args.retention_days)
+    elif args.command == "restore_archived":
+        restore_archived(db, table_name=args.table, ids=args.ids)
 
 
 if __name__ == "__main__":
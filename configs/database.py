@@ -1,9 +1,17 @@
 import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+from itertools import cycle
+from contextlib import asynccontextmanager
+from fastapi import Depends, Request
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 load_dotenv()
 
@@ -18,34 +26,158 @@ if DB_TYPE == "mysql":
     MYSQL_PASSWORD = quote_plus(os.getenv("MYSQL_PASSWORD"))
     MYSQL_DATABASE = os.getenv("MYSQL_DATABASE")
 
+    # Async driver used by the API: aiomysql or asyncmy
+    MYSQL_ASYNC_DRIVER = os.getenv("MYSQL_ASYNC_DRIVER", "aiomysql")
+
     SQLALCHEMY_DATABASE_URL = (
         f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
     )
+    ASYNC_SQLALCHEMY_DATABASE_URL = (
+        f"mysql+{MYSQL_ASYNC_DRIVER}://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+    )
 
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
+    POOL_OPTIONS = dict(
         pool_recycle=int(os.environ.get("POOL_RECYCLE", 180)),  # Time(in sec) after the connection is recycled
         pool_size=int(os.environ.get("POOL_SIZE", 10)),         # Number of connections to keep open in the pool
         max_overflow=int(os.environ.get("MAX_OVERFLOW", 20)),   # Number of connections to allow beyond the pool size
         pool_timeout=int(os.environ.get("POOL_TIMEOUT", 60)),   # Time(in sec) to wait before giving up on getting a connection
     )
 
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, **POOL_OPTIONS)
+    async_engine = create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL, **POOL_OPTIONS)
+
+    # Read replicas as comma-separated host[:port], sharing the primary's credentials
+    MYSQL_REPLICA_HOSTS = [h for h in os.getenv("MYSQL_REPLICA_HOSTS", "").split(",") if h]
+    replica_engines = [
+        create_async_engine(
+            f"mysql+{MYSQL_ASYNC_DRIVER}://{MYSQL_USER}:{MYSQL_PASSWORD}@"
+            f"{host if ':' in host else f'{host}:{MYSQL_PORT}'}/{MYSQL_DATABASE}",
+            **POOL_OPTIONS)
+        for host in MYSQL_REPLICA_HOSTS
+    ]
+
 elif DB_TYPE == "sqlite":
     # SQLite configuration
     SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "sqlite.db")
 
     SQLALCHEMY_DATABASE_URL = f"sqlite:///{SQLITE_DB_PATH}"
+    ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{SQLITE_DB_PATH}"
+
+    SQLITE_PRAGMAS = dict(
+        journal_mode=os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),      # Readers do not block the writer and vice versa
+        synchronous=os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),      # Safe with WAL; fsync at checkpoints only
+        mmap_size=int(os.environ.get("SQLITE_MMAP_SIZE", 268435456)),    # Bytes of the file to memory-map
+        cache_size=int(os.environ.get("SQLITE_CACHE_SIZE", -65536)),     # Page cache per connection; negative is KiB
+        busy_timeout=int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),   # Time(in ms) to wait for a lock before failing
+    )
+    # WAL lets readers run in parallel, so keep a pool of connections rather than one
+    SQLITE_POOL_OPTIONS = dict(
+        pool_size=int(os.environ.get("SQLITE_POOL_SIZE", 10)),
+        max_overflow=int(os.environ.get("SQLITE_MAX_OVERFLOW", 10)),
+    )
 
     engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, **SQLITE_POOL_OPTIONS
     )
+    async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **SQLITE_POOL_OPTIONS)
+
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+    # Local stand-in for replicas: database files refreshed from the primary by sync_sqlite_replicas
+    SQLITE_REPLICA_PATHS = [p for p in os.getenv("SQLITE_REPLICA_PATHS", "").split(",") if p]
+    replica_engines = [
+        create_async_engine(f"sqlite+aiosqlite:///{path}", **SQLITE_POOL_OPTIONS) for path in SQLITE_REPLICA_PATHS]
+    for replica in replica_engines:
+        event.listen(replica.sync_engine, "connect", _set_sqlite_pragmas)
 
 else:
     raise ValueError("Invalid DB_TYPE specified. Choose 'mysql' or 'sqlite'.")
 
+# SQLite allows one writer at a time; queue this process's writers instead of busy-waiting on the file lock
+SQLITE_SERIALIZE_WRITES = DB_TYPE == "sqlite" and bool(int(os.getenv("SQLITE_SERIALIZE_WRITES", 1)))
+_sqlite_write_lock = asyncio.Lock()
+
+
+class SerializedWriteSession(AsyncSession):
+    """
+    AsyncSession that holds the process-wide SQLite write lock from its first write
+    until the transaction ends. The lock is FIFO, so writers are served in arrival order.
+    """
+
+    _holds_write_lock = False
+
+    def _has_pending_writes(self) -> bool:
+        return bool(self.new or self.dirty or self.deleted)
+
+    async def _acquire_write_lock(self):
+        if not self._holds_write_lock:
+            await _sqlite_write_lock.acquire()
+            self._holds_write_lock = True
+
+    def _release_write_lock(self):
+        if self._holds_write_lock:
+            self._holds_write_lock = False
+            _sqlite_write_lock.release()
+
+    async def execute(self, statement, *args, **kwargs):
+        if getattr(statement, "is_dml", False):
+            await self._acquire_write_lock()
+        return await super().execute(statement, *args, **kwargs)
+
+    async def flush(self, objects=None):
+        if self._has_pending_writes():
+            await self._acquire_write_lock()
+        return await super().flush(objects)
+
+    async def commit(self):
+        if self._has_pending_writes():
+            await self._acquire_write_lock()
+        try:
+            return await super().commit()
+        finally:
+            self._release_write_lock()
+
+    async def rollback(self):
+        try:
+            return await super().rollback()
+        finally:
+            self._release_write_lock()
+
+    async def close(self):
+        try:
+            return await super().close()
+        finally:
+            self._release_write_lock()
+
+
+# Synchronous sessions are used by the CLI and Alembic
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async sessions are used by the API; objects stay readable after commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False,
+    class_=SerializedWriteSession if SQLITE_SERIALIZE_WRITES else AsyncSession)
+ReplicaSessionLocals = [
+    async_sessionmaker(bind=replica, autoflush=False, expire_on_commit=False)
+    for replica in replica_engines
+]
+_replica_cycle = cycle(ReplicaSessionLocals)
 Base = declarative_base()
 
+# Seconds a token keeps reading from the primary after it made a write
+READ_STICKINESS_SECONDS = float(os.getenv("READ_STICKINESS_SECONDS", 5))
+# Seconds between SQLite replica refreshes, i.e. the injected replication lag; 0 disables it
+SQLITE_REPLICA_SYNC_INTERVAL = float(os.getenv("SQLITE_REPLICA_SYNC_INTERVAL", 0))
+
+_sticky_until = {}
+
 
 def get_db():
     db = SessionLocal()
@@ -53,3 +185,79 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _sticky_key(authorization: str) -> str:
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def mark_write(authorization: str):
+    """
+    Route this token's reads to the primary for `READ_STICKINESS_SECONDS`, so it reads its own writes.
+    """
+    if not ReplicaSessionLocals or not authorization:
+        return
+    now = time.monotonic()
+    if len(_sticky_until) > 10000:
+        for key in [k for k, until in _sticky_until.items() if until <= now]:
+            del _sticky_until[key]
+    _sticky_until[_sticky_key(authorization)] = now + READ_STICKINESS_SECONDS
+
+
+def is_sticky(authorization: str) -> bool:
+    return bool(authorization) and _sticky_until.get(_sticky_key(authorization), 0) > time.monotonic()
+
+
+def read_sessionmaker(authorization: str = None) -> async_sessionmaker:
+    if not ReplicaSessionLocals or is_sticky(authorization):
+        return AsyncSessionLocal
+    return next(_replica_cycle)
+
+
+async def get_read_db(request: Request, primary: AsyncSession = Depends(get_async_db)):
+    """
+    Session for read-only work: a read replica, or the primary when none is configured
+    or the caller wrote recently. Sessions connect lazily, so the unused primary costs nothing.
+    """
+    sessionmaker_ = read_sessionmaker(request.headers.get("authorization"))
+    if sessionmaker_ is AsyncSessionLocal:
+        yield primary
+        return
+    async with sessionmaker_() as db:
+        yield db
+
+
+@asynccontextmanager
+async def primary_session(db: AsyncSession):
+    """
+    `db` when it is bound to the primary, otherwise a short-lived primary session.
+    For reads that must not lag behind writes, such as sync watermarks and cache refills.
+    """
+    if db.bind is async_engine:
+        yield db
+        return
+    async with AsyncSessionLocal() as primary:
+        yield primary
+
+
+def sync_sqlite_replicas():
+    """
+    Copy the SQLite primary into each replica file; run periodically to emulate replication lag.
+    """
+    if DB_TYPE != "sqlite":
+        return
+    source = sqlite3.connect(SQLITE_DB_PATH)
+    try:
+        for path in SQLITE_REPLICA_PATHS:
+            target = sqlite3.connect(path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    finally:
+        source.close()
@@ -8,6 +8,7 @@ from src.auth.models import ApiKey, UserToken
 from src.user.models import User, UserRole
 from src.department.models import Department
 from src.permission.models import Module, Permission, RolePermission
+from src.archive.models import ARCHIVE_TABLES
 
 # Alembic Config object
 config = context.config
@@ -23,6 +24,15 @@ config.set_main_option("sqlalchemy.url", ALEMBIC_SAFE_URL)
 # Metadata for 'autogenerate'
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip the full-text search tables and indexes, which are managed by hand."""
+    if type_ == "table" and "_fts" in name:
+        return False
+    if type_ == "index" and name.startswith("ft_"):
+        return False
+    return True
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
@@ -32,6 +42,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
         render_as_batch=True if "sqlite" in url else False,  # Enable batch mode for SQLite
     )
 
@@ -52,6 +63,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_object=include_object,
             render_as_batch=True if is_sqlite else False,  # Enable batch mode for SQLite
         )
 
@@ -0,0 +1,65 @@
+"""hash api keys
+
+Revision ID: d6e264e87a23
+Revises: 9394585c121f
+Create Date: 2026-10-16 10:12:31.402117
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6e264e87a23'
+down_revision: Union[str, None] = '9394585c121f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+api_keys = sa.table(
+    'api_keys',
+    sa.column('id', sa.Integer),
+    sa.column('key', sa.String),
+    sa.column('key_hash', sa.String),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('api_keys', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('key_hash', sa.String(length=64), nullable=True))
+
+    # Replace every plaintext key with its SHA-256 digest
+    conn = op.get_bind()
+    for row in conn.execute(sa.select(api_keys.c.id, api_keys.c.key)).fetchall():
+        conn.execute(
+            api_keys.update()
+            .where(api_keys.c.id == row.id)
+            .values(key_hash=hashlib.sha256(row.key.encode()).hexdigest())
+        )
+
+    with op.batch_alter_table('api_keys', schema=None) as batch_op:
+        batch_op.alter_column('key_hash',
+               existing_type=sa.String(length=64),
+               nullable=False)
+        batch_op.create_index(batch_op.f('ix_api_keys_key_hash'), ['key_hash'], unique=True)
+        batch_op.drop_column('key')
+
+
+def downgrade() -> None:
+    # Plaintext keys cannot be recovered; the digests are kept in `key`
+    # so the schema is restored, but the old keys will no longer authenticate.
+    with op.batch_alter_table('api_keys', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('key', sa.String(length=255), nullable=True))
+
+    conn = op.get_bind()
+    conn.execute(api_keys.update().values(key=api_keys.c.key_hash))
+
+    with op.batch_alter_table('api_keys', schema=None) as batch_op:
+        batch_op.alter_column('key',
+               existing_type=sa.String(length=255),
+               nullable=False)
+        batch_op.drop_index(batch_op.f('ix_api_keys_key_hash'))
+        batch_op.drop_column('key_hash')
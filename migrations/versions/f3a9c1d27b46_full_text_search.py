@@ -0,0 +1,72 @@
+"""full text search
+
+Revision ID: f3a9c1d27b46
+Revises: e1898d622009
+Create Date: 2026-10-16 14:20:11.408217
+
+SQLite: external-content FTS5 tables (trigram tokenizer) kept in sync by triggers.
+A batch migration that recreates one of the indexed tables drops its triggers, so
+such a migration must re-run `create_sqlite_fts` for that table.
+MySQL: FULLTEXT indexes with the ngram parser, maintained by InnoDB.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c1d27b46'
+down_revision: Union[str, None] = 'e1898d622009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = {
+    "users": ("name", "email", "phone"),
+    "user_roles": ("name",),
+    "departments": ("name",),
+}
+
+
+def create_sqlite_fts(table: str, columns: Sequence[str]) -> None:
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});"
+
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(f"DROP TRIGGER IF EXISTS {fts}_ai")
+    op.execute(f"DROP TRIGGER IF EXISTS {fts}_ad")
+    op.execute(f"DROP TRIGGER IF EXISTS {fts}_au")
+    op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END")
+    op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END")
+    op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {delete_old} {insert_new} END")
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, columns in SEARCH_COLUMNS.items():
+        if dialect == "sqlite":
+            create_sqlite_fts(table, columns)
+        elif dialect == "mysql":
+            op.execute(
+                f"ALTER TABLE {table} ADD FULLTEXT INDEX ft_{table}_search "
+                f"({', '.join(columns)}) WITH PARSER ngram"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table in SEARCH_COLUMNS:
+        if dialect == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        elif dialect == "mysql":
+            op.execute(f"ALTER TABLE {table} DROP INDEX ft_{table}_search")
@@ -0,0 +1,89 @@
+"""
+Shared setup for the in-process benchmarks in this directory: a throwaway SQLite
+database built by the migrations, a seeded department with a superuser and a role
+holding every permission, and a TestClient on the app.
+"""
+import os
+import sys
+import time
+import uuid
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_tmp = tempfile.mkdtemp(prefix="bench-")
+os.environ.update(
+    DB_TYPE="sqlite",
+    SQLITE_DB_PATH=os.environ.get("BENCH_DB_PATH", os.path.join(_tmp, "bench.db")),
+    SQLITE_REPLICA_PATHS="",
+    LOG_DIR=os.path.join(_tmp, "logs"),
+)
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-key-bench-secret-key")
+sys.path.insert(0, ROOT)
+subprocess.run(["alembic", "upgrade", "head"], cwd=ROOT, check=True, capture_output=True)
+
+from fastapi.testclient import TestClient
+
+import app
+from configs.database import SessionLocal
+from src.auth.utils import create_access_token
+from src.department.models import Department
+from src.permission.models import Module, Permission, RolePermission
+from src.user.models import User, UserRole
+
+PERMISSIONS = {
+    "user": ["list_user", "create_user", "update_user", "delete_user"],
+    "role": ["list_role", "create_role", "update_role", "delete_role"],
+    "permission": ["list_permission", "create_permission"],
+    "department": ["list_department"],
+}
+
+
+def seed():
+    """
+    Returns (department_id, superuser_id, role_id, permission_ids).
+    """
+    with SessionLocal() as db:
+        department = Department(name="bench")
+        db.add(department)
+        db.flush()
+        permission_ids = []
+        for module_name, names in PERMISSIONS.items():
+            module = Module(name=module_name)
+            db.add(module)
+            db.flush()
+            for name in names:
+                permission = Permission(name=name, module_id=module.id)
+                db.add(permission)
+                db.flush()
+                permission_ids.append(permission.id)
+        role = UserRole(name="bench", department_id=department.id)
+        db.add(role)
+        db.flush()
+        db.add_all([RolePermission(role_id=role.id, permission_id=pid) for pid in permission_ids])
+        superuser = User(name="su", email="su@bench", phone="0000000", password="x",
+                         is_superuser=True, department_id=department.id)
+        db.add(superuser)
+        db.commit()
+        return department.id, superuser.id, role.id, permission_ids
+
+
+DEPARTMENT_ID, SUPERUSER_ID, ROLE_ID, PERMISSION_IDS = seed()
+client = TestClient(app.app)
+
+
+def auth_headers(user_id: int = SUPERUSER_ID) -> dict:
+    token = create_access_token(data={"user_id": user_id, "phone": "0000000"}, jti=str(uuid.uuid4()))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def per_request(call, n: int = 200, warmup: int = 20):
+    """
+    Average (CPU ms, wall ms) of `call()` over `n` runs.
+    """
+    for _ in range(warmup):
+        call()
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(n):
+        call()
+    return (time.process_time() - cpu) / n * 1000, (time.perf_counter() - wall) / n * 1000
@@ -0,0 +1,53 @@
+"""
+N sequential single gets against one batch-get for users and roles: wall and CPU
+time per round and the SQL statements it runs, auth lookups included:
+
+    python scripts/bench_batch_get.py
+"""
+import time
+
+from sqlalchemy import event
+
+from bench_app import DEPARTMENT_ID, PERMISSION_IDS, SessionLocal, auth_headers, client
+from configs.database import async_engine
+from src.permission.models import RolePermission
+from src.user.models import User, UserRole
+
+ROUNDS = 5
+
+with SessionLocal() as db:
+    roles = [UserRole(name=f"role{i}", department_id=DEPARTMENT_ID) for i in range(50)]
+    db.add_all(roles)
+    db.flush()
+    db.add_all([RolePermission(role_id=role.id, permission_id=pid) for role in roles for pid in PERMISSION_IDS])
+    users = [User(name=f"user{i}", email=f"user{i}@bench", phone=f"5{i:06d}", password="x",
+                  role_id=roles[i].id, department_id=DEPARTMENT_ID) for i in range(50)]
+    db.add_all(users)
+    db.commit()
+    ids = {"users": [user.id for user in users], "roles": [role.id for role in roles]}
+
+statements = []
+event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+headers = auth_headers()
+
+
+def measure(call) -> tuple:
+    statements.clear()
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(ROUNDS):
+        call()
+    return ((time.perf_counter() - wall) / ROUNDS * 1000, (time.process_time() - cpu) / ROUNDS * 1000,
+            len(statements) / ROUNDS)
+
+
+for kind, kind_ids in ids.items():
+    batch = client.post(f"/api/v1/{kind}/batch-get", headers=headers, json={"ids": kind_ids}).json()["data"][kind]
+    single = client.get(f"/api/v1/{kind}/{kind_ids[3]}", headers=headers).json()["data"]
+    assert batch[3] == single, "batch item differs from the single get"
+    for n in (10, 50):
+        sequential = measure(lambda: [client.get(f"/api/v1/{kind}/{i}", headers=headers) for i in kind_ids[:n]])
+        batched = measure(lambda: client.post(f"/api/v1/{kind}/batch-get", headers=headers,
+                                              json={"ids": kind_ids[:n]}))
+        print(f"{kind} N={n:<3} sequential {sequential[0]:6.1f} ms wall {sequential[1]:6.1f} ms CPU "
+              f"{sequential[2]:4.0f} queries | batch {batched[0]:5.1f} ms wall {batched[1]:5.1f} ms CPU "
+              f"{batched[2]:2.0f} queries")
@@ -0,0 +1,26 @@
+"""
+CPU per request for GET /users and GET /roles at limit=100, with 100 users and
+100 roles of every permission. Run it on two checkouts to compare rendering paths:
+
+    python scripts/bench_envelope.py
+"""
+from bench_app import DEPARTMENT_ID, PERMISSION_IDS, ROLE_ID, SessionLocal, auth_headers, client, per_request
+from src.permission.models import RolePermission
+from src.user.models import User, UserRole
+
+with SessionLocal() as db:
+    for i in range(100):
+        db.add(User(name=f"user{i}", email=f"user{i}@bench", phone=f"5{i:06d}", password="x",
+                    role_id=ROLE_ID, department_id=DEPARTMENT_ID))
+        role = UserRole(name=f"role{i}", department_id=DEPARTMENT_ID)
+        db.add(role)
+        db.flush()
+        db.add_all([RolePermission(role_id=role.id, permission_id=pid) for pid in PERMISSION_IDS])
+    db.commit()
+
+headers = auth_headers()
+for path in ("/api/v1/users?limit=100", "/api/v1/roles?limit=100"):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200 and response.json()["status"] == 200, response.text[:200]
+    cpu, wall = per_request(lambda: client.get(path, headers=headers))
+    print(f"GET {path:<26} {cpu:6.2f} ms CPU/req {wall:6.2f} ms wall/req {len(response.content)} bytes")
@@ -0,0 +1,55 @@
+"""
+Write amplification of PUT /roles/{id} on its permission list: rows written to
+user_role_permissions by each of six updates (drop one, restore, drop, restore,
+clear, set three), and the rows the role holds afterwards:
+
+    python scripts/bench_role_update.py
+"""
+from sqlalchemy import event, func, select
+
+from bench_app import DEPARTMENT_ID, PERMISSION_IDS, ROLE_ID, SessionLocal, auth_headers, client
+from configs.database import async_engine
+from src.permission.models import RolePermission
+from src.user.models import User
+
+written = []
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def count_writes(conn, cursor, statement, parameters, context, executemany):
+    if "user_role_permissions" in statement and statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+        written.append(cursor.rowcount)
+
+
+def role_rows(role_id: int):
+    with SessionLocal() as db:
+        total = db.scalar(select(func.count()).where(RolePermission.role_id == role_id))
+        active = db.scalar(select(func.count()).where(
+            RolePermission.role_id == role_id, RolePermission.is_deleted == False))
+        return total, active
+
+
+# Roles can only be granted permissions their creator's role holds
+with SessionLocal() as db:
+    admin = User(name="admin", email="admin@bench", phone="0000001", password="x",
+                 role_id=ROLE_ID, department_id=DEPARTMENT_ID)
+    db.add(admin)
+    db.commit()
+    headers = auth_headers(admin.id)
+body = client.post("/api/v1/roles", headers=headers,
+                   json={"name": "updated", "permission_ids": PERMISSION_IDS}).json()
+assert body["status"] == 201, body
+role_id = body["data"]["id"]
+print(f"{'update':<14} {'statements':>10} {'rows written':>12} {'rows':>5} {'active':>6}")
+print(f"{'create':<14} {'':>10} {'':>12} {'{:>5} {:>6}'.format(*role_rows(role_id))}")
+
+updates = [("drop one", PERMISSION_IDS[:-1]), ("restore", PERMISSION_IDS), ("drop one", PERMISSION_IDS[:-1]),
+           ("restore", PERMISSION_IDS), ("clear", []), ("set three", PERMISSION_IDS[:3])]
+for label, permission_ids in updates:
+    written.clear()
+    body = client.put(f"/api/v1/roles/{role_id}", headers=headers,
+                      json={"name": "updated", "permission_ids": permission_ids}).json()
+    assert body["status"] == 200, body
+    total, active = role_rows(role_id)
+    assert active == len(permission_ids)
+    print(f"{label:<14} {len(written):>10} {sum(written):>12} {total:>5} {active:>6}")
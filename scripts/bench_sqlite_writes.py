@@ -0,0 +1,117 @@
+"""
+Concurrent SQLite writes and reads under the connection profile in configs/database.py.
+
+`db` runs writer and reader processes against the same file: writers insert
+user_tokens rows, readers count them and list users. `api` runs an in-process
+mix of PUT and GET /users through the app at a fixed concurrency. Compare
+profiles through the SQLITE_* variables, for example the old defaults:
+
+    SQLITE_JOURNAL_MODE=DELETE SQLITE_SYNCHRONOUS=FULL python scripts/bench_sqlite_writes.py db
+    python scripts/bench_sqlite_writes.py db
+"""
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import multiprocessing
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description="Measure concurrent SQLite writes and reads")
+parser.add_argument("mode", choices=["db", "api"])
+parser.add_argument("--writers", type=int, default=3, help="Writer processes (db)")
+parser.add_argument("--readers", type=int, default=3, help="Reader processes (db)")
+parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (api)")
+parser.add_argument("--write-ratio", type=float, default=0.3, help="Share of PUT requests (api)")
+parser.add_argument("--duration", type=float, default=5)
+args = parser.parse_args()
+
+import httpx
+from sqlalchemy import func, select
+
+from bench_app import DEPARTMENT_ID, ROLE_ID, SUPERUSER_ID, SessionLocal, app, auth_headers
+from configs.database import engine
+from src.auth.models import UserToken
+from src.user.models import User
+
+
+def work(kind: str, results: multiprocessing.Queue):
+    engine.dispose(close=False)  # connections inherited from the parent stay with it
+    done = errors = 0
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        with SessionLocal() as db:
+            try:
+                if kind == "write":
+                    db.add(UserToken(user_id=SUPERUSER_ID, token=uuid.uuid4().hex, jti=uuid.uuid4().hex,
+                                     expires_at=datetime.now() + timedelta(days=1)))
+                    db.commit()
+                else:
+                    db.scalar(select(func.count()).where(UserToken.user_id == SUPERUSER_ID))
+                    db.scalars(select(User).limit(20)).all()
+                done += 1
+            except Exception:
+                db.rollback()
+                errors += 1
+    results.put((kind, done, errors))
+
+
+def run_db():
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=work, args=(kind, results))
+                 for kind in ["write"] * args.writers + ["read"] * args.readers]
+    for process in processes:
+        process.start()
+    totals = {"write": [0, 0], "read": [0, 0]}
+    for _ in processes:
+        kind, done, errors = results.get()
+        totals[kind][0] += done
+        totals[kind][1] += errors
+    for process in processes:
+        process.join()
+    for kind, (done, errors) in totals.items():
+        print(f"{kind}s/s {done / args.duration:8.0f}  errors {errors}")
+
+
+async def run_api():
+    with SessionLocal() as db:
+        users = [User(name=f"mix{i}", email=f"mix{i}@bench", phone=f"6{i:06d}", password="x",
+                      role_id=ROLE_ID, department_id=DEPARTMENT_ID) for i in range(50)]
+        db.add_all(users)
+        db.commit()
+        contacts = {user.id: {"email": user.email, "phone": user.phone} for user in users}
+
+    headers = auth_headers()
+    counts = {"read": 0, "write": 0, "errors": 0}
+    latencies = []
+    transport = httpx.ASGITransport(app=app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.monotonic() + args.duration
+
+        async def worker():
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                if random.random() < args.write_ratio:
+                    user_id = random.choice(list(contacts))
+                    kind, r = "write", await client.put(f"/api/v1/users/{user_id}", headers=headers, json={
+                        "name": f"mix {random.random()}", "role_id": ROLE_ID, **contacts[user_id]})
+                else:
+                    kind, r = "read", await client.get("/api/v1/users?limit=20", headers=headers)
+                latencies.append(time.perf_counter() - started)
+                if r.status_code == 200 and r.json().get("status") == 200:
+                    counts[kind] += 1
+                else:
+                    counts["errors"] += 1
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    latencies.sort()
+    print(f"reads/s {counts['read'] / args.duration:.0f}  writes/s {counts['write'] / args.duration:.0f}  "
+          f"errors {counts['errors']}  p50 {latencies[len(latencies) // 2] * 1000:.0f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    if args.mode == "db":
+        run_db()
+    else:
+        asyncio.run(run_api())
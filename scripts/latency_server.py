@@ -0,0 +1,61 @@
+"""
+Run the app on SQLite with a fixed delay added to every statement.
+
+SQLite answers in microseconds, so it hides the cost of blocking on the
+database. This wraps sqlite3 so each execute first sleeps for --latency-ms on
+the calling thread, standing in for the round trip to a networked MySQL
+server. Start it from the root of the tree to measure, then point
+scripts/load_test.py at it:
+
+    python scripts/latency_server.py --latency-ms 2 --port 8000
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+
+import uvicorn
+
+
+def add_latency(seconds: float):
+    class SlowCursor(sqlite3.Cursor):
+        def execute(self, *args, **kwargs):
+            time.sleep(seconds)
+            return super().execute(*args, **kwargs)
+
+        def executemany(self, *args, **kwargs):
+            time.sleep(seconds)
+            return super().executemany(*args, **kwargs)
+
+    class SlowConnection(sqlite3.Connection):
+        def cursor(self, factory=SlowCursor):
+            return super().cursor(factory)
+
+    connect = sqlite3.connect
+
+    def slow_connect(*args, **kwargs):
+        kwargs.setdefault("factory", SlowConnection)
+        return connect(*args, **kwargs)
+
+    # The pysqlite dialect connects through sqlite3.dbapi2, aiosqlite through sqlite3;
+    # both look connect up at call time
+    sqlite3.connect = sqlite3.dbapi2.connect = slow_connect
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve app:app with a per-statement database delay")
+    parser.add_argument("--latency-ms", type=float, default=2, help="Delay added to each statement")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if os.getenv("DB_TYPE", "sqlite").lower() != "sqlite":
+        raise SystemExit("latency_server only wraps SQLite; set DB_TYPE=sqlite")
+    add_latency(args.latency_ms / 1000)
+    sys.path.insert(0, os.getcwd())
+    uvicorn.run("app:app", host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
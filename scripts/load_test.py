@@ -0,0 +1,80 @@
+"""
+Small closed-loop load generator for a running server.
+
+Logs in once, then keeps `concurrency` clients issuing GET requests to each
+path for `duration` seconds and prints throughput and latency per level:
+
+    python scripts/load_test.py --phone 0000000000 --password secret \
+        --paths /api/v1/users,/api/v1/roles --concurrency 1,8,32 --duration 10
+"""
+import time
+import argparse
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def login(base_url: str, phone: str, password: str) -> str:
+    body = requests.post(f"{base_url}/api/v1/auth/login",
+                         json={"phone": phone, "password": password}).json()
+    if body.get("status") != 200:
+        raise SystemExit(f"Login failed: {body}")
+    return body["data"]["access_token"]
+
+
+def client(url: str, headers: dict, deadline: float, latencies: list, errors: list, lock: threading.Lock):
+    session = requests.Session()
+    local_latencies, local_errors = [], 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            r = session.get(url, headers=headers)
+            if r.status_code != 200 or r.json().get("status") != 200:
+                local_errors += 1
+        except requests.RequestException:
+            local_errors += 1
+        local_latencies.append(time.perf_counter() - started)
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+def run_level(url: str, headers: dict, concurrency: int, duration: float) -> dict:
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client, url, headers, deadline, latencies, errors, lock)
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GET throughput at several concurrency levels")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--phone", required=True, help="Phone of the user to log in as")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--paths", default="/api/v1/users", help="Comma-separated GET paths")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per path and level")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {login(args.base_url, args.phone, args.password)}"}
+    print(f"{'path':<28} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+    for path in args.paths.split(","):
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            result = run_level(args.base_url + path, headers, concurrency, args.duration)
+            print(f"{path:<28} {concurrency:>7} {result['rps']:>8.1f} {result['p50_ms']:>8.1f} "
+                  f"{result['p95_ms']:>8.1f} {result['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
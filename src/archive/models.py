@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, Table
+
+from configs.database import Base
+from src.user.models import User, UserRole
+from src.permission.models import RolePermission
+
+
+def archive_table(hot: Table) -> Table:
+    """
+    A copy of `hot`'s columns without foreign keys, constraints or defaults,
+    plus the time each row was archived.
+    """
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key,
+               autoincrement=False, nullable=not column.primary_key)
+        for column in hot.columns
+    ]
+    return Table(
+        f"{hot.name}_archive", Base.metadata,
+        *columns,
+        Column("archived_at", DateTime(6), nullable=False, index=True),
+    )
+
+
+# Archived in this order, so rows are gone before the rows they reference
+ARCHIVE_TABLES = {
+    hot.name: (hot, archive_table(hot))
+    for hot in (RolePermission.__table__, User.__table__, UserRole.__table__)
+}
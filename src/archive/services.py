@@ -0,0 +1,104 @@
+import os
+import time
+from typing import Iterable
+from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from sqlalchemy import delete, exists, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from configs.logger import logger
+from configs.database import SessionLocal
+
+from src.archive.models import ARCHIVE_TABLES
+from src.user.models import User, UserRole
+from src.permission.models import RolePermission
+
+load_dotenv()
+
+# Seconds between background archiver runs; 0 disables the background task
+ARCHIVE_INTERVAL = int(os.environ.get("ARCHIVE_INTERVAL", 0))
+ARCHIVE_RETENTION_DAYS = int(os.environ.get("ARCHIVE_RETENTION_DAYS", 30))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", 1000))
+
+
+def archivable_filter(table_name: str, cutoff: datetime):
+    """
+    Rows soft-deleted before `cutoff` that no hot row still references. References from
+    rows archivable themselves do not count: their tables are archived first, so a dry run
+    reports the same rows a real run with the same `cutoff` moves.
+    """
+    hot, _ = ARCHIVE_TABLES[table_name]
+    condition = (hot.c.is_deleted == True) & (hot.c.updated_at < cutoff)
+    if table_name == UserRole.__tablename__:
+        for referencing in (User.__table__, RolePermission.__table__):
+            kept = or_(referencing.c.is_deleted == False, referencing.c.updated_at == None,
+                       referencing.c.updated_at >= cutoff)
+            condition &= ~exists().where(referencing.c.role_id == hot.c.id, kept)
+    return condition
+
+
+def archive_deleted_rows(
+    db: Session,
+    retention: timedelta,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Move archivable rows of each hot table into its `*_archive` table in batches of
+    `batch_size`: one INSERT ... SELECT and one DELETE per batch, committed together.
+    """
+    started = time.perf_counter()
+    # One cutoff for every table, so each table's filter agrees on what the earlier ones move
+    cutoff = datetime.now() - retention
+    moved = {}
+    for table_name, (hot, archive) in ARCHIVE_TABLES.items():
+        condition = archivable_filter(table_name, cutoff)
+        if dry_run:
+            moved[table_name] = db.scalar(select(func.count()).select_from(hot).where(condition))
+            continue
+
+        moved[table_name] = 0
+        while True:
+            ids = db.scalars(select(hot.c.id).where(condition).limit(batch_size)).all()
+            if not ids:
+                break
+            db.execute(archive.insert().from_select(
+                [*hot.columns.keys(), "archived_at"],
+                select(*hot.columns, literal(datetime.now()).label("archived_at")).where(hot.c.id.in_(ids)),
+            ))
+            db.execute(delete(hot).where(hot.c.id.in_(ids)))
+            db.commit()
+            moved[table_name] += len(ids)
+
+    result = {"rows": moved, "dry_run": dry_run, "seconds": round(time.perf_counter() - started, 3)}
+    logger.info(f"Archiver: {result}")
+    return result
+
+
+def restore_archived_rows(db: Session, table_name: str, ids: Iterable[int]) -> int:
+    """
+    Move rows back from `table_name`'s archive unchanged (they stay soft-deleted).
+    Restore referenced rows first, e.g. a role before its permissions.
+    """
+    hot, archive = ARCHIVE_TABLES[table_name]
+    ids = list(ids)
+    db.execute(hot.insert().from_select(
+        hot.columns.keys(),
+        select(*(archive.c[name] for name in hot.columns.keys())).where(archive.c.id.in_(ids)),
+    ))
+    restored = db.execute(delete(archive).where(archive.c.id.in_(ids))).rowcount
+    db.commit()
+    logger.info(f"Restored {restored} rows into {table_name}")
+    return restored
+
+
+def run_archiver():
+    """
+    Background task entry point.
+    """
+    with SessionLocal() as db:
+        return archive_deleted_rows(
+            db,
+            retention=timedelta(days=ARCHIVE_RETENTION_DAYS),
+            batch_size=ARCHIVE_BATCH_SIZE,
+        )
@@ -1,51 +1,76 @@
+import os
 import jwt
 from typing import List
-from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, Security
 from fastapi.security.api_key import APIKeyHeader
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from configs.database import get_db
-from src.auth.utils import decode_access_token
+from configs.database import get_read_db
+from src.metrics.services import register_metrics
+from src.auth.utils import decode_access_token, hash_api_key
 from src.auth.exceptions import APIKeyException, JWTException, UnauthorizedException
 
-from src.user.models import User
 from src.auth.models import ApiKey
-from src.permission.models import Permission, RolePermission
+from src.auth.revocation import ApiKeyCache
+from src.auth.services import Principal, load_principal
+from src.permission.bitset import PermissionRequirement
+from src.permission.services import permission_catalog
 
 
+load_dotenv()
+
 bearer_scheme = HTTPBearer(auto_error=False)
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
+# Validated API keys by hash; only hits are cached so new keys work immediately
+api_key_cache = ApiKeyCache(
+    maxsize=int(os.environ.get("API_KEY_CACHE_SIZE", 1024)),
+    ttl=int(os.environ.get("API_KEY_CACHE_TTL", 300)),
+    sync_interval=int(os.environ.get("API_KEY_SYNC_INTERVAL", 5)),
+)
+register_metrics("api_key_cache", api_key_cache.stats)
+
 
 async def get_api_key(
     api_key: str = Security(api_key_header),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     if api_key is None:
         raise APIKeyException(
             status=401, message="Authorization header missing")
 
     token = api_key.replace("Bearer ", "")
-    api_key_obj = db.query(ApiKey).filter(
-        ApiKey.key == token,
+    key_hash = hash_api_key(token)
+    await api_key_cache.sync(db)
+    api_key_obj = api_key_cache.get(key_hash)
+    if api_key_obj is not None:
+        return api_key_obj
+
+    api_key_obj = await db.scalar(select(ApiKey).where(
+        ApiKey.key_hash == key_hash,
         ApiKey.is_active == True,
         ApiKey.is_deleted == False
-    ).first()
+    ))
 
     if not api_key_obj:
         raise APIKeyException(status=403, message="Invalid API Key")
 
+    # Detach so the cached row can be shared across requests
+    db.expunge(api_key_obj)
+    api_key_cache.set(key_hash, api_key_obj)
     return api_key_obj
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)):
+async def get_principal(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: AsyncSession = Depends(get_read_db)):
     if credentials is None:
         raise JWTException(401, message="Authorization header missing")
 
     token = credentials.credentials
     try:
-        payload = decode_access_token(db, token)
+        payload = await decode_access_token(db, token)
         user_id = payload.get('user_id')
         if not user_id:
             raise JWTException(401, message="Invalid token")
@@ -53,32 +78,31 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_
         raise JWTException(
             401, message="Could not validate credentials")
 
-    user_id = payload.get("user_id")
-    user = User.get_active(db).filter(User.id == user_id).first()
-    if not user:
+    principal = await load_principal(db, user_id, claims=payload)
+    if not principal:
         raise JWTException(401, message="Invalid user")
-    return user
+    return principal
+
+
+async def get_current_user(principal: Principal = Depends(get_principal)):
+    return principal.user
 
 
 def has_role_permission(required_permissions: List[str]):
+    # Compiled once when the router is imported; resolved to a bitmask per permission catalog version
+    requirement = PermissionRequirement(required_permissions)
+
     async def dependency(
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        principal: Principal = Depends(get_principal),
+        db: AsyncSession = Depends(get_read_db),
     ):
         # Check if the user is a superuser
-        if current_user.is_superuser:
+        if principal.user.is_superuser:
             return  # Bypass permission checks for superusers
 
-        # Fetch user's role permissions
-        user_permissions = (
-            db.query(Permission.name)
-            .join(RolePermission, Permission.id == RolePermission.permission_id)
-            .filter(RolePermission.role_id == current_user.role_id, RolePermission.is_deleted == False)
-            .all()
-        )
-        user_permissions = [perm.name for perm in user_permissions]
-
-        # Check if the user has the required permissions
-        if not any(perm in user_permissions for perm in required_permissions):
+        catalog = await permission_catalog.get(db)
+
+        # Check if the user has any of the required permissions
+        if not requirement.is_satisfied_by(principal.permission_mask, catalog):
             raise UnauthorizedException(403, "Permission denied")
     return dependency
@@ -17,3 +17,10 @@ class UnauthorizedException(Exception):
         self.status = status
         self.message = message
         self.data = data or {}
+
+
+class ServiceUnavailableException(Exception):
+    def __init__(self, status: int, message: str, data: dict = None):
+        self.status = status
+        self.message = message
+        self.data = data or {}
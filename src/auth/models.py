@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 
 from src.models import AbstractBase
 
@@ -7,7 +7,7 @@ class ApiKey(AbstractBase):
     __tablename__ = "api_keys"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    key = Column(String(255), nullable=False)
+    key_hash = Column(String(64), nullable=False, unique=True, index=True)
 
     def __repr__(self):
         return f"{self.id}"
@@ -15,6 +15,10 @@ class ApiKey(AbstractBase):
 
 class UserToken(AbstractBase):
     __tablename__ = "user_tokens"
+    __table_args__ = (
+        Index('ix_user_tokens_is_blacklisted_updated_at', 'is_blacklisted', 'updated_at'),
+        Index('ix_user_tokens_expires_at', 'expires_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     token = Column(String(255), unique=True)
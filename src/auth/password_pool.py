@@ -0,0 +1,79 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.auth.exceptions import ServiceUnavailableException
+
+
+class PasswordPool:
+    """
+    Bounded executor for CPU-heavy password hashing and verification.
+
+    At most `workers` jobs run at once and `queue_size` more may wait; any job
+    beyond that is rejected immediately instead of piling up behind the others.
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 64, kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError("Invalid password pool kind. Choose 'thread' or 'process'.")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.kind = kind
+        self.completed = 0
+        self.rejected = 0
+        self._pending = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            executor_class = ProcessPoolExecutor if self.kind == "process" else ThreadPoolExecutor
+            self._executor = executor_class(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise ServiceUnavailableException(
+                    503, message="Server is busy, please try again")
+            self._pending += 1
+            executor = self._get_executor()
+
+        submitted_at = time.perf_counter()
+        future = executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._finish(submitted_at))
+        return future
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _finish(self, submitted_at: float):
+        latency = time.perf_counter() - submitted_at
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self._pending,
+                "queue_depth": max(0, self._pending - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_latency_ms": round(self._latency_total / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_latency_ms": round(self._latency_max * 1000, 2),
+            }
@@ -0,0 +1,84 @@
+import os
+import time
+from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from configs.logger import logger
+from configs.database import SessionLocal
+from src.auth.revocation import utcnow
+from src.auth.utils import ACCESS_TOKEN_EXPIRE_MINUTES
+
+from src.auth.models import UserToken
+
+load_dotenv()
+
+# Seconds between background reaper runs; 0 disables the background task
+TOKEN_REAPER_INTERVAL = int(os.environ.get("TOKEN_REAPER_INTERVAL", 0))
+TOKEN_REAPER_BATCH_SIZE = int(os.environ.get("TOKEN_REAPER_BATCH_SIZE", 1000))
+
+
+def reapable_tokens_filter(access_token_lifetime: timedelta):
+    """
+    Rows no token can still be validated against: refresh tokens that have expired,
+    and blacklisted tokens whose access tokens have all expired since.
+    """
+    return or_(
+        UserToken.expires_at < utcnow() - access_token_lifetime,
+        (UserToken.is_blacklisted == True) & (
+            UserToken.updated_at < datetime.now() - access_token_lifetime),
+    )
+
+
+def reap_user_tokens(
+    db: Session,
+    access_token_lifetime: timedelta,
+    batch_size: int = 1000,
+    pause: float = 0.0,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Delete expired and blacklisted rows from `user_tokens` in batches of `batch_size`,
+    committing after each batch so locks are held only briefly.
+    """
+    started = time.perf_counter()
+    condition = reapable_tokens_filter(access_token_lifetime)
+
+    if dry_run:
+        deleted = db.scalar(select(func.count()).select_from(UserToken).where(condition))
+    else:
+        deleted = 0
+        while True:
+            ids = db.scalars(
+                select(UserToken.id).where(condition).limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            db.execute(delete(UserToken).where(UserToken.id.in_(ids)))
+            db.commit()
+            deleted += len(ids)
+            if pause:
+                time.sleep(pause)
+
+    seconds = time.perf_counter() - started
+    result = {
+        "rows": deleted,
+        "dry_run": dry_run,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(deleted / seconds, 1) if seconds and not dry_run else 0.0,
+    }
+    logger.info(f"User token reaper: {result}")
+    return result
+
+
+def run_token_reaper():
+    """
+    Background task entry point.
+    """
+    with SessionLocal() as db:
+        return reap_user_tokens(
+            db,
+            access_token_lifetime=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+            batch_size=TOKEN_REAPER_BATCH_SIZE,
+        )
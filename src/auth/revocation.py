@@ -0,0 +1,135 @@
+import time
+import asyncio
+from sqlalchemy import select, or_
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+
+from src.cache import TTLCache
+from configs.database import primary_session
+from src.auth.models import ApiKey, UserToken
+
+
+def utcnow() -> datetime:
+    # expires_at is written as UTC and read back without tzinfo
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RevocationStore:
+    """
+    In-memory set of blacklisted token jtis, kept in sync with `user_tokens`.
+
+    The first sync loads every blacklisted row whose tokens can still be in use;
+    later syncs only read rows whose `updated_at` moved past the watermark.
+    Syncs read the primary, since a lagging replica would let the watermark pass unseen rows.
+    A jti is dropped once no token carrying it can still be valid. Until the first
+    sync has finished, every caller waits for it rather than checking an empty store.
+    """
+
+    def __init__(self, access_token_lifetime: timedelta, sync_interval: float = 5, sync_overlap: float = 5):
+        self.access_token_lifetime = access_token_lifetime
+        self.sync_interval = sync_interval
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+        self.syncs = 0
+        self._revoked = {}
+        self._watermark: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._lock = asyncio.Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def revoke(self, jti: str, expires_at: Optional[datetime] = None):
+        if expires_at is None:
+            expires_at = utcnow()
+        self._revoked[jti] = expires_at + self.access_token_lifetime
+
+    def _is_fresh(self) -> bool:
+        return self._watermark is not None and time.monotonic() < self._next_sync
+
+    async def sync(self, db: AsyncSession, force: bool = False):
+        if self._watermark is not None:
+            # Once loaded, a request may skip a sync another request is already running
+            if (not force and self._is_fresh()) or self._lock.locked():
+                return
+        async with self._lock:
+            if not force and self._is_fresh():
+                return  # the initial load finished while this request waited for it
+            started_at = datetime.now()
+            query = select(UserToken.jti, UserToken.expires_at).where(
+                UserToken.is_blacklisted == True)
+            if self._watermark is None:
+                query = query.where(
+                    UserToken.expires_at > utcnow() - self.access_token_lifetime)
+            else:
+                query = query.where(
+                    UserToken.updated_at >= self._watermark - self.sync_overlap)
+
+            async with primary_session(db) as primary:
+                for row in await primary.execute(query):
+                    self.revoke(row.jti, row.expires_at)
+
+            self._prune()
+            self._watermark = started_at
+            self._next_sync = time.monotonic() + self.sync_interval
+            self.syncs += 1
+
+    def _prune(self):
+        now = utcnow()
+        for jti, prune_at in list(self._revoked.items()):
+            if prune_at < now:
+                self._revoked.pop(jti, None)
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._revoked),
+            "syncs": self.syncs,
+            "sync_interval": self.sync_interval,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
+
+
+class ApiKeyCache(TTLCache):
+    """
+    Validated API keys by hash, with keys deactivated or deleted elsewhere evicted.
+
+    Each sync reads the keys whose `updated_at` moved past the watermark on the primary
+    and drops the ones no longer usable, so a revoked key stops working within
+    `sync_interval` seconds instead of lasting out the TTL. Whatever deactivates a key
+    must bump its `updated_at`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, sync_interval: float = 5, sync_overlap: float = 5):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.sync_interval = sync_interval
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+        self.syncs = 0
+        self._watermark: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._sync_lock = asyncio.Lock()
+
+    async def sync(self, db: AsyncSession, force: bool = False):
+        if (not force and time.monotonic() < self._next_sync) or self._sync_lock.locked():
+            return
+        async with self._sync_lock:
+            started_at = datetime.now()
+            # Nothing can be cached before the first sync, so it only sets the watermark
+            if self._watermark is not None:
+                query = select(ApiKey.key_hash).where(
+                    ApiKey.updated_at >= self._watermark - self.sync_overlap,
+                    or_(ApiKey.is_active == False, ApiKey.is_deleted == True))
+                async with primary_session(db) as primary:
+                    for key_hash in await primary.scalars(query):
+                        self.invalidate(key_hash)
+
+            self._watermark = started_at
+            self._next_sync = time.monotonic() + self.sync_interval
+            self.syncs += 1
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "syncs": self.syncs,
+            "sync_interval": self.sync_interval,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
@@ -1,43 +1,54 @@
 import uuid
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload, undefer
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Request, Depends
 
-from configs.database import get_db
+from configs.database import get_async_db
 from src.helpers import ResponseHelper
+from src.schemas import Envelope
 from src.auth.dependencies import get_current_user
 from src.auth.utils import (
-    create_access_token, create_refresh_token, verify_password, blacklist_token, decode_refresh_token, hash_password
+    create_access_token, create_refresh_token, verify_password_async, blacklist_token, decode_refresh_token,
+    hash_password_async, EMBED_PERMISSION_CLAIMS
 )
 
 from src.user.models import User
-from src.auth.schemas import LoginSchema, RefreshTokenSchema, ResetPasswordSchema, LoginResponseSchema
-from src.auth.services import get_user_permissions
+from src.auth.schemas import (
+    LoginSchema, RefreshTokenSchema, ResetPasswordSchema, LoginResponseSchema, TokenRefreshResponseSchema)
+from src.auth.services import get_user_permissions, get_permission_claims
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 response = ResponseHelper()
 
 
-@router.post("/login")
+@router.post("/login", response_model=Envelope[LoginResponseSchema])
 async def login(
     request: Request,
     data: LoginSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.phone == data.phone).first()
-    if not user or not verify_password(data.password, user.password):
+    user = await db.scalar(
+        select(User)
+        .options(joinedload(User.role), joinedload(User.department), undefer(User.password))
+        .where(User.phone == data.phone)
+    )
+    if not user or not await verify_password_async(data.password, user.password):
         return response.error_response(401, message="Invalid credentials")
     if not user.is_active:
         return response.error_response(403, message="Inactive user")
 
+    # Read everything the response needs before the refresh token is committed
+    user_permissions = await get_user_permissions(db, user)
+
     jti = str(uuid.uuid4())
     access_token = create_access_token(
-        data={"user_id": user.id, "phone": user.phone}, jti=jti)
-    refresh_token = create_refresh_token(
+        data={"user_id": user.id, "phone": user.phone, **await get_permission_claims(db, user)}, jti=jti)
+    refresh_token = await create_refresh_token(
         db=db,
         data={"user_id": user.id, "phone": user.phone}, jti=jti)
 
-    user_permissions = get_user_permissions(db, user)
-
     user_data = {
         "id": user.id,
         "name": user.name,
@@ -59,58 +70,72 @@ async def login(
     return response.success_response(200, 'success', resp_data)
 
 
-@router.post("/refresh-token")
+@router.post("/refresh-token", response_model=Envelope[TokenRefreshResponseSchema])
 async def refresh_token(
     request: Request,
     data: RefreshTokenSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Refresh a token
     """
-    payload = decode_refresh_token(db, data.refresh_token)
+    payload = await decode_refresh_token(db, data.refresh_token)
+    claims = {}
+    if EMBED_PERMISSION_CLAIMS:
+        user = await db.scalar(
+            User.select_active()
+            .options(joinedload(User.role))
+            .where(User.id == payload.get("user_id"))
+        )
+        if not user:
+            return response.error_response(401, message="Invalid user")
+        claims = await get_permission_claims(db, user)
+
     access_token = create_access_token(
         data={"user_id": payload.get(
-            "user_id"), "phone": payload.get("phone")},
+            "user_id"), "phone": payload.get("phone"), **claims},
         jti=payload.get("jti")
     )
 
-    resp_data = {
-        "access_token": access_token,
-        "refresh_token": data.refresh_token
-    }
+    resp_data = TokenRefreshResponseSchema(
+        access_token=access_token,
+        refresh_token=data.refresh_token
+    )
     return response.success_response(200, 'success', resp_data)
 
 
-@router.post("/logout")
+@router.post("/logout", response_model=Envelope[None])
 async def logout(
     request: Request,
     data: RefreshTokenSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """
     Blacklist the token
     """
-    blacklist_token(data.refresh_token, db)
+    await blacklist_token(data.refresh_token, db)
     return response.success_response(200, 'success')
 
 
-@router.post("/password-reset")
+@router.post("/password-reset", response_model=Envelope[None])
 async def reset_password(
     request: Request,
     data: ResetPasswordSchema,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     """
     Reset Users Password
     """
-    if not verify_password(data.current_password, user.password):
+    current_hash = await db.scalar(select(User.password).where(User.id == user.id))
+    if not await verify_password_async(data.current_password, current_hash):
         return response.error_response(400, message="Current password did not matched!")
-    new_password = hash_password(data.new_password)
+    new_password = await hash_password_async(data.new_password)
 
-    user.password = new_password
-    db.commit()
+    # `user` may come from a read replica session, so write through the primary
+    await db.execute(update(User).where(User.id == user.id).values(
+        password=new_password, updated_at=datetime.now()))
+    await db.commit()
 
     return response.success_response(200, 'success')
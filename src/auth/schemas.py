@@ -16,6 +16,11 @@ class ResetPasswordSchema(BaseModel):
     new_password: str = Field(..., min_length=6, max_length=18)
 
 
+class TokenRefreshResponseSchema(BaseModel):
+    access_token: str
+    refresh_token: str
+
+
 class LoggedInUserSchema(BaseModel):
     id: int
     name: str
@@ -28,8 +33,13 @@ class LoggedInUserSchema(BaseModel):
     department_name: Optional[str] = None
 
 
+class ModulePermissionNames(BaseModel):
+    module_name: str
+    permissions: List[str]
+
+
 class LoginResponseSchema(BaseModel):
     access_token: str
     refresh_token: str
     user: LoggedInUserSchema
-    permissions: Optional[List[str]] = None
+    permissions: Optional[List[ModulePermissionNames]] = None
@@ -1,34 +1,81 @@
-from sqlalchemy.orm import Session
+from dataclasses import dataclass
+from sqlalchemy.orm import joinedload
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.exceptions import JWTException
+from src.auth.utils import EMBED_PERMISSION_CLAIMS
+from src.permission.services import load_role_permission_mask, permission_catalog
+from src.role.services import role_versions
+from src.role.versions import role_version
 
-from src.permission.models import Permission, Module, RolePermission
 from src.user.models import User
 
 
-def get_user_permissions(db: Session, user: User):
-    # Fetch permissions based on the user's role
-    permissions_query = (
-        db.query(Permission, Module)
-        .join(Module, Permission.module_id == Module.id)
-        .join(RolePermission, RolePermission.permission_id == Permission.id)
-        .filter(
-            Permission.is_deleted == False,
-            Module.is_deleted == False,
-            RolePermission.role_id == user.role_id
-        )
-        .order_by(Module.id.asc(), Permission.id.asc())
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated caller, resolved once per request.
+    """
+    user: User
+    permission_mask: int = 0
+
+
+async def load_principal(db: AsyncSession, user_id: int, claims: Optional[dict] = None) -> Optional[Principal]:
+    """
+    Load the user together with role and department in one query. The permission
+    mask comes from the token claims when present, otherwise from the permission
+    catalog, the same snapshot permission checks and login payloads read.
+    """
+    user = await db.scalar(
+        User.select_active()
+        .options(joinedload(User.role), joinedload(User.department))
+        .where(User.id == user_id)
     )
+    if not user:
+        return None
+    if user.is_superuser:
+        return Principal(user=user)
+
+    if claims and "perm" in claims:
+        if claims.get("role_id") != user.role_id or (
+            user.role_id is not None
+            and not await role_versions.is_current(db, user.role_id, claims.get("role_version"))
+        ):
+            raise JWTException(401, message="Token permissions are outdated")
+        return Principal(user=user, permission_mask=int(claims["perm"], 16))
+
+    catalog = await permission_catalog.get(db)
+    return Principal(user=user, permission_mask=catalog.role_masks.get(user.role_id, 0))
+
+
+async def get_permission_claims(db: AsyncSession, user: User) -> dict:
+    """
+    Build the permission claims for an access token, or nothing if they are disabled.
+    `user.role` must already be loaded.
+    """
+    if not EMBED_PERMISSION_CLAIMS or user.is_superuser:
+        return {}
+    if user.role_id is None:
+        return {"role_id": None, "role_version": 0, "perm": "0"}
 
-    # Group permissions by module
-    permissions_by_module = {}
-    for permission, module in permissions_query.all():
-        if module.id not in permissions_by_module:
-            permissions_by_module[module.id] = {
-                "module_name": module.name,
-                "permissions": [],
-            }
-        permissions_by_module[module.id]["permissions"].append(permission.name)
+    # Read the mask fresh so it can never be older than the version it is paired with
+    permission_mask = await load_role_permission_mask(db, user.role_id)
+    return {
+        "role_id": user.role_id,
+        "role_version": role_version(user.role),
+        "perm": format(permission_mask, "x"),
+    }
 
-    # Prepare permissions response
-    permissions_response = list(permissions_by_module.values())
 
-    return permissions_response
+async def get_user_permissions(db: AsyncSession, user: User):
+    # Permission names granted to the user's role, grouped by module
+    catalog = await permission_catalog.get(db)
+    granted = catalog.role_grants.get(user.role_id, frozenset())
+    return [
+        {
+            "module_name": module.name,
+            "permissions": [permission.name for permission in permissions],
+        }
+        for module, permissions in catalog.grouped(granted)
+    ]
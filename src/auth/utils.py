@@ -1,12 +1,17 @@
 import os
 import jwt
+import hashlib
 from dotenv import load_dotenv
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 
 from src.auth.exceptions import JWTException
+from src.auth.revocation import RevocationStore
+from src.auth.password_pool import PasswordPool
+from src.metrics.services import register_metrics
 
 from src.auth.models import UserToken
 
@@ -18,9 +23,25 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(
     os.environ.get("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 REFRESH_TOKEN_EXPIRE_MINUTES = int(
     os.environ.get("JWT_REFRESH_TOKEN_EXPIRE_MINUTES", 60*24*7))
+REVOCATION_SYNC_INTERVAL = int(os.environ.get("REVOCATION_SYNC_INTERVAL", 5))
+# Embed the role's permission mask and version in access tokens
+EMBED_PERMISSION_CLAIMS = bool(int(os.environ.get("JWT_EMBED_PERMISSIONS", 0)))
+
+revocation_store = RevocationStore(
+    access_token_lifetime=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    sync_interval=REVOCATION_SYNC_INTERVAL,
+)
+register_metrics("revocation_store", revocation_store.stats)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+password_pool = PasswordPool(
+    workers=int(os.environ.get("PASSWORD_POOL_WORKERS", 4)),
+    queue_size=int(os.environ.get("PASSWORD_POOL_QUEUE_SIZE", 64)),
+    kind=os.environ.get("PASSWORD_POOL_KIND", "thread").lower(),
+)
+register_metrics("password_pool", password_pool.stats)
+
 
 def create_access_token(data: dict, jti: str, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -37,7 +58,7 @@ def create_access_token(data: dict, jti: str, expires_delta: Optional[timedelta]
     return encoded_jwt
 
 
-def create_refresh_token(db: Session, data: dict, jti: str, expires_delta: Optional[timedelta] = None):
+async def create_refresh_token(db: AsyncSession, data: dict, jti: str, expires_delta: Optional[timedelta] = None):
     """
     Create a JWT refresh token.
     """
@@ -53,12 +74,12 @@ def create_refresh_token(db: Session, data: dict, jti: str, expires_delta: Optio
     user_token = UserToken(token=encoded_jwt, expires_at=expire,
                            user_id=to_encode.get("user_id"), jti=jti)
     db.add(user_token)
-    db.commit()
+    await db.commit()
 
     return encoded_jwt
 
 
-def decode_access_token(db: Session, token: str) -> dict:
+async def decode_access_token(db: AsyncSession, token: str) -> dict:
     """
     Decode a JWT and validate it.
     """
@@ -67,9 +88,13 @@ def decode_access_token(db: Session, token: str) -> dict:
         if payload.get("type") != "access":
             raise JWTException(401, message="Invalid token type")
 
-        check_blacklist_token(db=db, jti=payload.get("jti"))
-        match_jti_from_db(db=db, jti=payload.get("jti"),
-                          user_id=payload.get("user_id"))
+        jti = payload.get("jti")
+        if not jti:
+            raise JWTException(401, message="Invalid token")
+
+        await revocation_store.sync(db)
+        if revocation_store.is_revoked(jti):
+            raise JWTException(401, message="Token has been blacklisted")
         return payload
     except jwt.ExpiredSignatureError:
         raise JWTException(401, message="Token has expired")
@@ -77,13 +102,13 @@ def decode_access_token(db: Session, token: str) -> dict:
         raise JWTException(401, message="Invalid token")
 
 
-def decode_refresh_token(db: Session, token: str) -> dict:
+async def decode_refresh_token(db: AsyncSession, token: str) -> dict:
     """
     Decode a JWT and validate it.
     """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        check_blacklist_token(db=db, jti=payload.get("jti"))
+        await check_refresh_token(db=db, jti=payload.get("jti"))
         if payload.get("type") != "refresh":
             raise JWTException(401, message="Invalid token type")
         return payload
@@ -101,35 +126,63 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def blacklist_token(token: str, db: Session):
+def hash_api_key(key: str) -> str:
+    """
+    API keys are random 256-bit tokens, so an unsalted SHA-256 digest is enough to
+    store them safely and still look them up by equality.
+    """
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the password pool instead of the event loop.
+    """
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the password pool instead of the event loop.
+    """
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def blacklist_token(token: str, db: AsyncSession):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.PyJWTError:
         raise JWTException(
             401, message="Invalid token")
     jti = payload.get("jti")
-    check_blacklist_token(db=db, jti=jti)
-    db_token = db.query(UserToken).filter(
-        UserToken.jti == jti, UserToken.is_blacklisted == False).first()
+    await check_blacklist_token(db=db, jti=jti)
+    db_token = await db.scalar(select(UserToken).where(
+        UserToken.jti == jti, UserToken.is_blacklisted == False))
     if db_token:
         db_token.is_blacklisted = True
-        db.commit()
+        db_token.updated_at = datetime.now()
+        await db.commit()
+        revocation_store.revoke(jti, db_token.expires_at)
     else:
         raise JWTException(401, message="Invalid token")
 
 
-def check_blacklist_token(db: Session, jti: str):
-    db_token = db.query(UserToken).filter(
-        UserToken.jti == jti, UserToken.is_blacklisted == True).first()
+async def check_blacklist_token(db: AsyncSession, jti: str):
+    db_token = await db.scalar(select(UserToken).where(
+        UserToken.jti == jti, UserToken.is_blacklisted == True))
     if db_token:
         raise JWTException(401, message="Token has been blacklisted")
     else:
         return True
 
 
-def match_jti_from_db(db: Session, jti: str, user_id: int) -> Optional[UserToken]:
-    db_token = db.query(UserToken).filter(
-        UserToken.jti == jti, UserToken.user_id == user_id, UserToken.is_blacklisted == False).first()
-    if not db_token:
+
+async def check_refresh_token(db: AsyncSession, jti: str):
+    # The row must still exist: reaped tokens are as dead as blacklisted ones
+    is_blacklisted = await db.scalar(
+        select(UserToken.is_blacklisted).where(UserToken.jti == jti))
+    if is_blacklisted is None:
         raise JWTException(401, message="Invalid token")
-    return db_token
+    if is_blacklisted:
+        raise JWTException(401, message="Token has been blacklisted")
+    return True
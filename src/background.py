@@ -0,0 +1,30 @@
+import asyncio
+from typing import Callable, List
+
+from configs.logger import logger
+
+_tasks: List[asyncio.Task] = []
+
+
+async def _run_periodically(name: str, interval: float, job: Callable[[], object]):
+    while True:
+        try:
+            # Jobs use the synchronous engine, so keep them off the event loop
+            await asyncio.to_thread(job)
+        except Exception as e:
+            logger.error(f"Background task {name} failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def schedule(name: str, interval: float, job: Callable[[], object]):
+    """
+    Run `job` every `interval` seconds in a worker thread until the app shuts down.
+    """
+    _tasks.append(asyncio.create_task(_run_periodically(name, interval, job), name=name))
+
+
+async def cancel_all():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
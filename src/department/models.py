@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 
 from src.models import AbstractBase
 
 
 class Department(AbstractBase):
     __tablename__ = 'departments'
+    __table_args__ = (
+        Index('ix_departments_updated_at', 'updated_at'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False, unique=True)
@@ -1,49 +1,67 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Request, Depends
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import SerializeAsAny
+from fastapi import APIRouter, Request, Response, Depends
 
-from configs.database import get_db
+from configs.database import get_async_db, get_read_db
 from src.helpers import ResponseHelper
+from src.search import search_filter
+from src.fields import parse_fields, sparse_validate, load_columns
+from src.etag import max_updated_at, weak_etag, etag_matches, not_modified
 from src.auth.dependencies import get_current_user
 
 from src.user.models import User
 from src.department.models import Department
-from src.schemas import Pagination
+from src.schemas import Envelope, Pagination
 from src.department.schemas import DepartmentCreate, DepartmentUpdate, DepartmentGet, DepartmentListResponse
 
 router = APIRouter(prefix="/departments", tags=["Departments"])
 response = ResponseHelper()
 
 
-@router.get("")
+@router.get("", response_model=Envelope[DepartmentListResponse])
 async def get_departments(
     request: Request,
+    http_response: Response,
     page: int = 1,
     limit: int = 10,
+    q: str = None,
     name: str = None,
-    db: Session = Depends(get_db),
+    fields: str = None,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
     if not user.is_superuser:
         return response.error_response(403, "Permission denied")
+    try:
+        fields = parse_fields(fields, DepartmentGet)
+    except ValueError as e:
+        return response.error_response(400, str(e))
 
-    query = Department.get_active(db)
+    etag = weak_etag("departments", await db.scalar(select(max_updated_at(Department))))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    http_response.headers["ETag"] = etag
 
+    query = Department.select_active().options(load_columns(Department, fields or DepartmentGet.model_fields))
+
+    if q:
+        query = query.where(search_filter(Department, q))
     if name:
-        query = query.filter(Department.name.ilike(f"%{name}%"))
+        query = query.where(Department.name.ilike(f"%{name}%"))
 
-    total_records = query.count()
+    total_records = await db.scalar(select(func.count()).select_from(query.subquery()))
     total_pages = (total_records + limit - 1) // limit
     offset = (page - 1) * limit
 
-    data_list = (
+    data_list = await db.scalars(
         query.order_by(Department.name.asc())
         .offset(offset)
         .limit(limit)
-        .all()
     )
 
-    departments = [DepartmentGet.model_validate(data) for data in data_list]
+    departments = [sparse_validate(DepartmentGet, data, fields) for data in data_list]
 
     base_url = str(request.url.path)
     previous_page_url = f"{base_url}?page={page - 1}&limit={limit}" if page > 1 else None
@@ -65,43 +83,50 @@ async def get_departments(
     return response.success_response(200, 'Success', resp_data)
 
 
-@router.get("/{department_id}")
+@router.get("/{department_id}", response_model=Envelope[SerializeAsAny[DepartmentGet]])
 async def get_department(
     department_id: int,
-    db: Session = Depends(get_db),
+    fields: str = None,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
     if not user.is_superuser:
         return response.error_response(403, "Permission denied")
-    department = Department.get_active(db).filter(
+    try:
+        fields = parse_fields(fields, DepartmentGet)
+    except ValueError as e:
+        return response.error_response(400, str(e))
+
+    department = await db.scalar(Department.select_active().options(
+        load_columns(Department, fields or DepartmentGet.model_fields)
+    ).where(
         Department.id == department_id
-    ).first()
+    ))
 
     if not department:
         return response.error_response(404, "Department not found")
 
-    resp_data = DepartmentGet.model_validate(department)
+    resp_data = sparse_validate(DepartmentGet, department, fields)
 
     return response.success_response(200, "success", resp_data)
 
 
-@router.post("")
+@router.post("", response_model=Envelope[DepartmentGet])
 async def create_department(
     request: Request,
     data: DepartmentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     if not user.is_superuser:
         return response.error_response(403, "Permission denied")
 
     # Check for duplicate department by name
-    if (
-        Department.get_active(db)
-        .filter(
+    if await db.scalar(
+        Department.select_active()
+        .where(
             Department.name == data.name,
         )
-        .first()
     ):
         return response.error_response(400, "Department exists with this name")
 
@@ -109,68 +134,65 @@ async def create_department(
         name=data.name
     )
     db.add(new_department)
-    db.commit()
-    db.refresh(new_department)
+    await db.commit()
 
     reps_data = DepartmentGet.model_validate(new_department)
 
     return response.success_response(201, "Department created successfully", reps_data)
 
 
-@router.put("/{department_id}")
+@router.put("/{department_id}", response_model=Envelope[DepartmentGet])
 async def update_department(
     department_id: int,
     data: DepartmentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     if not user.is_superuser:
         return response.error_response(403, "Permission denied")
 
-    department = Department.get_active(db).filter(
+    department = await db.scalar(Department.select_active().where(
         Department.id == department_id
-    ).first()
+    ))
     if not department:
         return response.error_response(404, "Department not found")
 
     # Check for duplicate Department by name (excluding the current department)
-    if (
-        Department.get_active(db)
-        .filter(
+    if await db.scalar(
+        Department.select_active()
+        .where(
             Department.name == data.name,
             Department.id != department_id,
         )
-        .first()
     ):
         return response.error_response(400, "Department exists with this name")
 
     department.name = data.name
     department.updated_at = datetime.now()
-    db.commit()
-    db.refresh(department)
+    await db.commit()
 
     resp_data = DepartmentGet.model_validate(department)
 
     return response.success_response(200, "Department updated successfully", resp_data)
 
 
-@router.delete("/{department_id}")
+@router.delete("/{department_id}", response_model=Envelope[None])
 async def delete_department(
     department_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
     if not user.is_superuser:
         return response.error_response(403, "Permission denied")
 
-    department = Department.get_active(db).filter(
+    department = await db.scalar(Department.select_active().where(
         Department.id == department_id,
-    ).first()
+    ))
 
     if not department:
         return response.error_response(404, "Department not found")
 
     department.soft_delete()
-    db.commit()
+    await db.commit()
 
     return response.success_response(200, "Department deleted successfully")
@@ -1,6 +1,6 @@
 from typing import List
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, SerializeAsAny
 
 from src.schemas import Pagination
 
@@ -29,4 +29,4 @@ class DepartmentGet(DepartmentBase):
 
 class DepartmentListResponse(BaseModel):
     pagination: Pagination
-    departments: List[DepartmentGet]
+    departments: List[SerializeAsAny[DepartmentGet]]  # sparse subclasses when `fields=` is given
@@ -0,0 +1,33 @@
+import hashlib
+from fastapi import Request, Response
+from sqlalchemy import func, select
+
+
+def max_updated_at(model, *where):
+    """
+    Scalar subquery for the latest `updated_at` of `model`. Every write bumps `updated_at`
+    (soft deletes included), so this changes whenever any matching row does.
+    """
+    return select(func.max(model.updated_at)).where(*where).scalar_subquery()
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Weak comparison of `etag` against the request's If-None-Match header.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -2,7 +2,7 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
-from src.auth.exceptions import APIKeyException, JWTException, UnauthorizedException
+from src.auth.exceptions import APIKeyException, JWTException, UnauthorizedException, ServiceUnavailableException
 
 app = FastAPI()
 
@@ -73,3 +73,16 @@ async def unauthorized_exception_handler(request: Request, exc: UnauthorizedExce
             "data": {}
         }
     )
+
+
+@app.exception_handler(ServiceUnavailableException)
+async def service_unavailable_exception_handler(request: Request, exc: ServiceUnavailableException):
+    return JSONResponse(
+        status_code=503,
+        content={
+            "status": 503,
+            "message": exc.message,
+            "data": {}
+        },
+        headers={"Retry-After": "1"}
+    )
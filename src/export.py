@@ -0,0 +1,78 @@
+import io
+import os
+import csv
+import json
+from datetime import datetime
+from dotenv import load_dotenv
+from typing import AsyncIterator, Sequence
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from configs.database import AsyncSessionLocal
+
+load_dotenv()
+
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+async def iter_rows(query, sessionmaker: async_sessionmaker = AsyncSessionLocal) -> AsyncIterator[dict]:
+    """
+    Stream the rows of a column select through a server-side cursor, `EXPORT_BATCH_SIZE`
+    rows at a time. Uses its own session since the response outlives the request handler.
+    """
+    async with sessionmaker() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for row in result.mappings():
+            yield dict(row)
+
+
+async def encode_rows(records: AsyncIterator[dict], columns: Sequence[str], fmt: str) -> AsyncIterator[str]:
+    """
+    Encode records as NDJSON or CSV, yielding one chunk per `EXPORT_BATCH_SIZE` records.
+    List values are joined with ';' in CSV.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(columns)
+
+    pending = 0
+    async for record in records:
+        if fmt == "csv":
+            writer.writerow([
+                ";".join(map(str, value)) if isinstance(value, list)
+                else value.isoformat() if isinstance(value, datetime)
+                else value
+                for value in (record[column] for column in columns)
+            ])
+        else:
+            buffer.write(json.dumps({column: record[column] for column in columns}, default=_json_default))
+            buffer.write("\n")
+        pending += 1
+        if pending >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(records: AsyncIterator[dict], columns: Sequence[str], fmt: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        encode_rows(records, columns, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
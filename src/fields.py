@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import FrozenSet, Optional, Type
+from pydantic import BaseModel, Field, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """
+    Field names requested by a comma-separated `fields=` parameter, or None for all
+    of `model`'s fields. Raises ValueError naming any field `model` does not have.
+    """
+    if fields is None:
+        return None
+    names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = names - model.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return names or None
+
+
+@lru_cache(maxsize=256)
+def sparse_model(model: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """
+    Subclass of `model` whose fields outside `fields` default to None and are left out
+    of its output. Declare the response field as `SerializeAsAny[model]` so the subclass
+    serializer is used.
+    """
+    hidden = {
+        name: (Optional[info.annotation], Field(None, exclude=True))
+        for name, info in model.model_fields.items() if name not in fields
+    }
+    return create_model(f"Sparse{model.__name__}", __base__=model, **hidden)
+
+
+def sparse_validate(model: Type[BaseModel], obj, fields: Optional[FrozenSet[str]] = None) -> BaseModel:
+    """
+    Validate `obj` into `model`, or, when `fields` is given, into its sparse variant
+    reading only those attributes so unloaded columns are never touched.
+    """
+    if fields is None:
+        return model.model_validate(obj)
+    if not isinstance(obj, dict):
+        obj = {name: getattr(obj, name) for name in fields}
+    return sparse_model(model, fields).model_validate(obj)
+
+
+def load_columns(entity, names):
+    """
+    `load_only` for the mapped columns of `entity` among `names`; the primary key is always loaded.
+    """
+    columns = inspect(entity).column_attrs
+    return load_only(entity.id, *(getattr(entity, name) for name in names if name in columns and name != "id"))
@@ -1,4 +1,92 @@
+import os
+import json
+import base64
+from dotenv import load_dotenv
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import BigInteger, and_, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache import TTLCache
+from src.metrics.services import register_metrics
+
+load_dotenv()
+
+COUNT_MODES = ("exact", "none", "cached")
+COUNT_CACHE_SIZE = int(os.environ.get("COUNT_CACHE_SIZE", 1024))
+COUNT_CACHE_TTL = int(os.environ.get("COUNT_CACHE_TTL", 30))
+
+# One cache per resource so a write only drops the counts it can affect
+_count_caches: Dict[str, TTLCache] = {}
+
+
+def get_count_cache(resource: str) -> TTLCache:
+    if resource not in _count_caches:
+        _count_caches[resource] = TTLCache(maxsize=COUNT_CACHE_SIZE, ttl=COUNT_CACHE_TTL)
+    return _count_caches[resource]
+
+
+def invalidate_counts(resource: str):
+    get_count_cache(resource).clear()
+
+
+register_metrics("count_cache", lambda: {
+    resource: cache.stats() for resource, cache in _count_caches.items()})
+
+
+class Page(NamedTuple):
+    items: List
+    total: Optional[int]
+    total_exact: bool
+    has_next: bool
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def cursor_value_valid(column, value) -> bool:
+    """
+    Whether `value` has `column`'s Python type and, for integers, fits the column (INT or BIGINT).
+    """
+    python_type = column.type.python_type
+    if python_type is int:
+        bound = 2 ** 63 if isinstance(column.type, BigInteger) else 2 ** 31
+        return type(value) is int and -bound <= value < bound
+    return type(value) is python_type
+
+
+def decode_cursor(cursor: str, columns: tuple) -> list:
+    """
+    Raises ValueError for anything that is not a cursor produced by `encode_cursor`
+    for `columns`: one value per column, of the column's type and range.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    if not all(cursor_value_valid(column, value) for column, value in zip(columns, values)):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_after(columns: tuple, values: list):
+    """
+    Rows strictly after `values` in ascending (col1, col2, ...) order, written as
+    an OR of prefixes so each branch can use the index on those columns.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column > values[i]))
+    return or_(*clauses)
+
+
 class ResponseHelper:
+    # Routes declare `response_model=Envelope[...]`, so these plain dicts are validated
+    # and serialized by pydantic-core; `data` models pass through without re-validation
     def success_response(self, status_code, message, data=None):
         return ({
             "status": status_code,
@@ -13,7 +101,48 @@ class ResponseHelper:
             "data": data
         })
 
-    def paginate_query(self, query, page: int, limit: int):
-        total = query.count()
-        items = query.offset((page - 1) * limit).limit(limit).all()
-        return items, total
+    async def count_query(self, db: AsyncSession, query, count: str = "exact", count_key: tuple = None):
+        """
+        Count the rows of `query`. Returns (total, exact): `none` skips the count,
+        `cached` reuses a recent count for the same `count_key`, whose first
+        element names the resource.
+        """
+        if count == "none":
+            return None, False
+        if count == "cached" and count_key is not None:
+            total = get_count_cache(count_key[0]).get(count_key)
+            if total is not None:
+                return total, False
+
+        # Count over a constant column so the subquery never selects wide or deferred columns
+        rows = query.with_only_columns(literal_column("1"), maintain_column_froms=True).order_by(None)
+        total = await db.scalar(select(func.count()).select_from(rows.subquery()))
+        if count == "cached" and count_key is not None:
+            get_count_cache(count_key[0]).set(count_key, total)
+        return total, True
+
+    async def paginate_query(self, db: AsyncSession, query, page: int, limit: int,
+                             count: str = "exact", count_key: tuple = None) -> Page:
+        # Fetch one extra row to learn whether there is a next page without counting
+        items = (await db.scalars(query.offset((page - 1) * limit).limit(limit + 1))).all()
+        total, total_exact = await self.count_query(db, query, count, count_key)
+        return Page(items[:limit], total, total_exact, len(items) > limit)
+
+    async def paginate_query_cursor(self, db: AsyncSession, query, cursor: str, limit: int, order_by: tuple,
+                                    count: str = "exact", count_key: tuple = None) -> Page:
+        """
+        Keyset pagination. `order_by` must end with a unique column; the cursor holds
+        its values for the last row of the previous page. Raises ValueError for a bad cursor.
+        """
+        last_values = decode_cursor(cursor, order_by) if cursor else None
+        total, total_exact = await self.count_query(db, query, count, count_key)
+        query = query.order_by(None).order_by(*order_by)
+        if last_values is not None:
+            query = query.where(keyset_after(order_by, last_values))
+
+        items = (await db.scalars(query.limit(limit + 1))).all()
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor([getattr(items[-1], column.key) for column in order_by])
+        return Page(items, total, total_exact, next_cursor is not None, next_cursor)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+
+from src.helpers import ResponseHelper
+from src.schemas import Envelope
+from src.auth.dependencies import get_current_user
+
+from src.user.models import User
+from src.metrics.services import collect_metrics
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+response = ResponseHelper()
+
+
+@router.get("", response_model=Envelope[dict])
+async def get_metrics(
+    user: User = Depends(get_current_user),
+):
+    if not user.is_superuser:
+        return response.error_response(403, "Permission denied")
+
+    return response.success_response(200, "success", collect_metrics())
@@ -1,6 +1,6 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import Column, DateTime, Boolean
+from sqlalchemy import Column, DateTime, Boolean, select
 
 from configs.database import Base
 
@@ -22,3 +22,7 @@ class AbstractBase(Base):
     @classmethod
     def get_active(cls, db: Session):
         return db.query(cls).filter(cls.is_deleted == False)
+
+    @classmethod
+    def select_active(cls):
+        return select(cls).where(cls.is_deleted == False)
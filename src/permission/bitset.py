@@ -0,0 +1,35 @@
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from src.permission.catalog import CatalogSnapshot
+
+
+def mask_from_ids(permission_ids: Iterable[int]) -> int:
+    """
+    Compile permission ids into a bitmask; a permission's id is its bit position.
+    """
+    mask = 0
+    for permission_id in permission_ids:
+        mask |= 1 << permission_id
+    return mask
+
+
+class PermissionRequirement:
+    """
+    A set of permission names of which the caller needs at least one, compiled
+    to a bitmask once per version of the permission catalog.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = tuple(names)
+        self._mask = 0
+        self._version = None
+
+    def mask(self, catalog: "CatalogSnapshot") -> int:
+        if self._version != catalog.version:
+            self._mask = catalog.permission_mask(self.names)
+            self._version = catalog.version
+        return self._mask
+
+    def is_satisfied_by(self, permission_mask: int, catalog: "CatalogSnapshot") -> bool:
+        return bool(permission_mask & self.mask(catalog))
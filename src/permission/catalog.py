@@ -0,0 +1,150 @@
+import time
+import asyncio
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.database import primary_session
+from src.etag import max_updated_at
+from src.permission.bitset import mask_from_ids
+
+from src.permission.models import Module, Permission, RolePermission
+
+
+class CatalogPermission(NamedTuple):
+    id: int
+    name: str
+    module_id: int
+    is_active: bool
+    is_deleted: bool
+
+
+class CatalogModule(NamedTuple):
+    id: int
+    name: str
+    is_deleted: bool
+    permissions: Tuple[CatalogPermission, ...]  # ordered by id
+
+
+class CatalogSnapshot(NamedTuple):
+    version: tuple
+    modules: Tuple[CatalogModule, ...]  # ordered by id
+    by_name: Dict[str, CatalogPermission]
+    role_grants: Dict[int, FrozenSet[int]]  # active grants only
+    role_masks: Dict[int, int]  # role_grants as permission bitmasks
+
+    def permission_mask(self, names: Iterable[str]) -> int:
+        # Names without a permission row cannot be granted, so they get no bit
+        return mask_from_ids(self.by_name[name].id for name in names if name in self.by_name)
+
+    def grouped(self, permission_ids: Optional[FrozenSet[int]] = None,
+                include_deleted: bool = False) -> Iterator[Tuple[CatalogModule, List[CatalogPermission]]]:
+        """
+        Modules with their permissions, in id order, limited to `permission_ids` when given.
+        Modules left without permissions are skipped.
+        """
+        for module in self.modules:
+            if module.is_deleted and not include_deleted:
+                continue
+            permissions = [
+                permission for permission in module.permissions
+                if (include_deleted or not permission.is_deleted)
+                and (permission_ids is None or permission.id in permission_ids)
+            ]
+            if permissions:
+                yield module, permissions
+
+
+async def catalog_version(db: AsyncSession) -> tuple:
+    """
+    Latest write to modules, permissions and role grants, in one query answered from the `updated_at` indexes.
+    """
+    return tuple((await db.execute(select(
+        max_updated_at(Permission), max_updated_at(Module), max_updated_at(RolePermission),
+    ))).one())
+
+
+async def build_snapshot(db: AsyncSession, version: tuple) -> CatalogSnapshot:
+    permissions_by_module: Dict[int, List[CatalogPermission]] = {}
+    by_name = {}
+    for row in await db.execute(
+        select(Permission.id, Permission.name, Permission.module_id, Permission.is_active, Permission.is_deleted)
+        .order_by(Permission.id)
+    ):
+        permission = CatalogPermission(row.id, row.name, row.module_id, row.is_active, row.is_deleted)
+        by_name[permission.name] = permission
+        permissions_by_module.setdefault(permission.module_id, []).append(permission)
+
+    modules = tuple(
+        CatalogModule(row.id, row.name, row.is_deleted, tuple(permissions_by_module.get(row.id, ())))
+        for row in await db.execute(select(Module.id, Module.name, Module.is_deleted).order_by(Module.id))
+    )
+
+    role_grants: Dict[int, set] = {}
+    for row in await db.execute(
+        select(RolePermission.role_id, RolePermission.permission_id).where(RolePermission.is_deleted == False)
+    ):
+        role_grants.setdefault(row.role_id, set()).add(row.permission_id)
+
+    return CatalogSnapshot(
+        version=version,
+        modules=modules,
+        by_name=by_name,
+        role_grants={role_id: frozenset(ids) for role_id, ids in role_grants.items()},
+        role_masks={role_id: mask_from_ids(ids) for role_id, ids in role_grants.items()},
+    )
+
+
+class PermissionCatalog:
+    """
+    Process-wide snapshot of modules, permissions and role grants, the one source for
+    permission listings, login payloads and authorization checks. Local writes drop it
+    through `invalidate`; writes from other processes are noticed by comparing the
+    catalog version at most every `sync_interval` seconds. It is rebuilt only when the version moved.
+    Both read the primary, so a refill never brings back data a replica has not caught up on.
+    """
+
+    def __init__(self, sync_interval: float = 5):
+        self.sync_interval = sync_interval
+        self.builds = 0
+        self.syncs = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._next_sync = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._snapshot = None
+        self._generation += 1
+
+    def _is_fresh(self) -> bool:
+        return self._snapshot is not None and time.monotonic() < self._next_sync
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        if self._is_fresh():
+            return self._snapshot
+        async with self._lock:
+            if self._is_fresh():
+                return self._snapshot
+            generation = self._generation
+            async with primary_session(db) as primary:
+                version = await catalog_version(primary)
+                self.syncs += 1
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.version != version:
+                    snapshot = await build_snapshot(primary, version)
+                    self.builds += 1
+            if generation == self._generation:
+                # Keep it only if no local write invalidated the catalog while it was read
+                self._snapshot = snapshot
+                self._next_sync = time.monotonic() + self.sync_interval
+            return snapshot
+
+    def stats(self) -> dict:
+        return {
+            "version": [str(part) for part in self._snapshot.version] if self._snapshot else None,
+            "permissions": len(self._snapshot.by_name) if self._snapshot else 0,
+            "builds": self.builds,
+            "syncs": self.syncs,
+            "sync_interval": self.sync_interval,
+        }
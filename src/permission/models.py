@@ -1,11 +1,14 @@
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 
 from src.models import AbstractBase
 
 
 class Module(AbstractBase):
     __tablename__ = 'modules'
+    __table_args__ = (
+        Index('ix_modules_updated_at', 'updated_at'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False, unique=True)
@@ -16,6 +19,10 @@ class Module(AbstractBase):
 
 class Permission(AbstractBase):
     __tablename__ = 'permissions'
+    __table_args__ = (
+        Index('ix_permissions_module_id_is_deleted', 'module_id', 'is_deleted'),
+        Index('ix_permissions_updated_at', 'updated_at'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False, unique=True)
@@ -29,6 +36,12 @@ class Permission(AbstractBase):
 
 class RolePermission(AbstractBase):
     __tablename__ = 'user_role_permissions'
+    __table_args__ = (
+        Index('ix_user_role_permissions_role_id_is_deleted_permission_id',
+              'role_id', 'is_deleted', 'permission_id'),
+        Index('ix_user_role_permissions_role_id_updated_at', 'role_id', 'updated_at'),
+        Index('ix_user_role_permissions_updated_at', 'updated_at'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     role_id = Column(Integer, ForeignKey('user_roles.id'), nullable=False)
@@ -1,81 +1,79 @@
+from typing import List
 from datetime import datetime
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Request, Depends
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Request, Response, Depends
 
-from configs.database import get_db
+from configs.database import get_async_db, get_read_db
 from src.helpers import ResponseHelper
+from src.etag import weak_etag, etag_matches, not_modified
+from src.schemas import Envelope
 from src.auth.dependencies import get_current_user, has_role_permission
 
 from src.user.models import User
-from src.permission.models import Module, Permission, RolePermission
-from src.permission.schemas import PermissionGet, PermissionCreate, PermissionUpdate
+from src.permission.models import Permission
+from src.permission.schemas import PermissionGet, PermissionCreate, PermissionUpdate, ModulePermissions
+from src.permission.services import permission_catalog
 
 router = APIRouter(prefix="/permissions", tags=["Permissions"])
 response = ResponseHelper()
 
 
-@router.get("")
+@router.get("", response_model=Envelope[List[ModulePermissions]])
 async def get_permissions(
     request: Request,
+    http_response: Response,
     name: str = None,
     is_active: bool = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["list_permission"])),
 ):
-    query = (
-        db.query(Permission, Module)
-        .outerjoin(Module, Permission.module_id == Module.id)
-        .filter(Permission.is_deleted == False, Module.is_deleted == False)
-    )
-
-    if not user.is_superuser:
-        query = query.outerjoin(
-            RolePermission,
-            RolePermission.permission_id == Permission.id,
-        ).filter(
-            RolePermission.role_id == user.role_id,
-            RolePermission.is_deleted == False,
-        )
+    catalog = await permission_catalog.get(db)
 
-    if name:
-        query = query.filter(Permission.name.ilike(f"%{name}%"))
-    if is_active is not None:
-        query = query.filter(Permission.is_active == is_active)
+    # Superusers see the whole catalog; everyone else only their role's grants
+    role_id = None if user.is_superuser else user.role_id
+    etag = weak_etag("permissions", user.is_superuser, role_id, *catalog.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    http_response.headers["ETag"] = etag
 
-    results = query.order_by(Module.id.asc(), Permission.id.asc()).all()
+    granted = None if user.is_superuser else catalog.role_grants.get(user.role_id, frozenset())
+    name = name.lower() if name else None
 
-    grouped_data = {}
-    for permission, module in results:
-        if module.name not in grouped_data:
-            grouped_data[module.name] = {
-                "module_id": module.id,
-                "module_name": module.name,
-                "permissions": [],
-            }
-        grouped_data[module.name]["permissions"].append(
+    resp_data = []
+    for module, permissions in catalog.grouped(granted):
+        permissions = [
             {
                 "permission_id": permission.id,
                 "permission_name": permission.name,
                 "is_active": permission.is_active,
             }
-        )
-
-    resp_data = list(grouped_data.values())
+            for permission in permissions
+            if (not name or name in permission.name.lower())
+            and (is_active is None or permission.is_active == is_active)
+        ]
+        if permissions:
+            resp_data.append({
+                "module_id": module.id,
+                "module_name": module.name,
+                "permissions": permissions,
+            })
 
     return response.success_response(200, "success", resp_data)
 
 
-@router.get("/{permission_id}")
+@router.get("/{permission_id}", response_model=Envelope[PermissionGet])
 async def get_permission(
     permission_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["list_permission"])),
 ):
-    permission = Permission.get_active(db).filter(
+    permission = await db.scalar(Permission.select_active().options(joinedload(Permission.module)).where(
         Permission.id == permission_id
-    ).first()
+    ))
 
     if not permission:
         return response.error_response(404, "Permission not found")
@@ -85,22 +83,22 @@ async def get_permission(
     return response.success_response(200, "Success", resp_data)
 
 
-@router.post("")
+@router.post("", response_model=Envelope[PermissionGet])
 async def create_permission(
     request: Request,
     data: PermissionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["create_permission"])),
 ):
     if not user.is_superuser:
         return response.error_response(403, "Permission denied")
 
-    if (
-        Permission.get_active(db)
-        .filter(
+    if await db.scalar(
+        Permission.select_active()
+        .where(
             Permission.name == data.name
-        ).first()
+        )
     ):
         return response.error_response(400, "Permission exists with this name")
 
@@ -109,39 +107,40 @@ async def create_permission(
         module_id=data.module_id,
     )
     db.add(new_permission)
-    db.commit()
+    await db.commit()
+    permission_catalog.invalidate()
+    await db.refresh(new_permission, ["module"])
 
     resp_data = PermissionGet.model_validate(new_permission)
 
     return response.success_response(201, "Permission created successfully", resp_data)
 
 
-@router.put("/{permission_id}")
+@router.put("/{permission_id}", response_model=Envelope[PermissionGet])
 async def update_permission(
     permission_id: int,
     data: PermissionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["update_permission"])),
 ):
     if not user.is_superuser:
         return response.error_response(403, "Permission denied")
 
-    query = db.query(Permission).filter(
+    query = select(Permission).where(
         Permission.id == permission_id,
         Permission.is_deleted == False,
     )
-    permission = query.first()
+    permission = await db.scalar(query)
     if not permission:
         return response.error_response(404, "Permission not found")
 
-    if (
-        Permission.get_active(db)
-        .filter(
+    if await db.scalar(
+        Permission.select_active()
+        .where(
             Permission.name == data.name,
             Permission.id != permission_id
         )
-        .first()
     ):
         return response.error_response(400, "Permission exists with this name")
 
@@ -149,29 +148,31 @@ async def update_permission(
     permission.module_id = data.module_id
     permission.updated_at = datetime.now()
 
-    db.commit()
-    db.refresh(permission)
+    await db.commit()
+    await db.refresh(permission, ["module"])
+    permission_catalog.invalidate()
 
     resp_data = PermissionGet.model_validate(permission)
 
     return response.success_response(200, "Permission updated successfully", resp_data)
 
 
-@router.delete("/{permission_id}")
+@router.delete("/{permission_id}", response_model=Envelope[None])
 async def delete_permission(
     permission_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["delete_permission"])),
 ):
     if not user.is_superuser:
         return response.error_response(403, "Permission denied")
-    permission = Permission.get_active(db).filter(
+    permission = await db.scalar(Permission.select_active().where(
         Permission.id == permission_id
-    ).first()
+    ))
     if not permission:
         return response.error_response(404, "Permission not found")
     permission.soft_delete()
-    db.commit()
+    await db.commit()
+    permission_catalog.invalidate()
 
     return response.success_response(200, "Permission deleted successfully")
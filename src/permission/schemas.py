@@ -1,3 +1,4 @@
+from typing import List
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -24,6 +25,18 @@ class PermissionGet(PermissionBase):
         from_attributes = True
 
 
+class ModulePermissionItem(BaseModel):
+    permission_id: int
+    permission_name: str
+    is_active: bool
+
+
+class ModulePermissions(BaseModel):
+    module_id: int
+    module_name: str
+    permissions: List[ModulePermissionItem]
+
+
 class PermissionCreate(BaseModel):
     name: str = Field(..., min_length=5, max_length=100)
     module_id: int = Field(..., gt=0)
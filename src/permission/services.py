@@ -0,0 +1,29 @@
+import os
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.database import primary_session
+from src.metrics.services import register_metrics
+from src.permission.bitset import mask_from_ids
+from src.permission.catalog import PermissionCatalog
+
+from src.permission.models import RolePermission
+
+load_dotenv()
+
+permission_catalog = PermissionCatalog(
+    sync_interval=int(os.environ.get("PERMISSION_CATALOG_SYNC_INTERVAL", 5)))
+register_metrics("permission_catalog", permission_catalog.stats)
+
+
+async def load_role_permission_mask(db: AsyncSession, role_id: int) -> int:
+    """
+    Read a role's permission bitmask straight from the primary, bypassing the catalog.
+    """
+    async with primary_session(db) as primary:
+        permission_ids = await primary.scalars(
+            select(RolePermission.permission_id)
+            .where(RolePermission.role_id == role_id, RolePermission.is_deleted == False)
+        )
+        return mask_from_ids(permission_ids)
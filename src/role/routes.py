@@ -1,105 +1,227 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Request, Depends
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import SerializeAsAny
+from typing import Literal
+from fastapi import APIRouter, Request, Response, Depends
 
 from configs.logger import logger
-from configs.database import get_db
-from src.helpers import ResponseHelper
+from configs.database import get_async_db, get_read_db, read_sessionmaker
+from src.helpers import ResponseHelper, invalidate_counts
+from src.search import search_filter
+from src.fields import parse_fields, sparse_validate, load_columns
 from src.auth.dependencies import get_current_user, has_role_permission
 
 from src.permission.models import RolePermission
 from src.user.models import User, UserRole
-from src.schemas import Pagination
-from src.role.schemas import RoleGet, RoleListResponse, RoleCreate, RoleUpdate
-from src.role.services import get_role_permissions, format_role
+from src.schemas import BatchGetRequest, Envelope, Pagination
+from src.role.schemas import RoleGet, RoleListResponse, RoleCreate, RoleUpdate, RoleBatchGetResponse
+from src.role.services import (
+    get_role_permissions, format_role, role_versions, export_roles_query, iter_roles_with_permissions,
+    sync_role_permissions, role_detail_version, ROLE_COLUMNS)
+from src.etag import weak_etag, etag_matches, not_modified
+from src.export import export_response
+from src.role.versions import role_version
+from src.permission.services import permission_catalog
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
 response = ResponseHelper()
 
 
-@router.get("")
+@router.get("", response_model=Envelope[RoleListResponse])
 async def get_roles(
     request: Request,
     page: int = 1,
     limit: int = 10,
+    cursor: str = None,
+    count: Literal["exact", "none", "cached"] = "exact",
+    q: str = None,
     name: str = None,
     is_active: bool = None,
-    db: Session = Depends(get_db),
+    fields: str = None,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["list_role"])),
 ):
-    query = UserRole.get_active(db)
+    try:
+        fields = parse_fields(fields, RoleGet)
+    except ValueError as e:
+        return response.error_response(400, str(e))
+
+    query = UserRole.select_active().options(load_columns(UserRole, fields or ROLE_COLUMNS))
     if not user.is_superuser:
-        query = query.filter(UserRole.department_id == user.department_id)
+        query = query.where(UserRole.department_id == user.department_id)
+    if q:
+        query = query.where(search_filter(UserRole, q))
     if name:
-        query = query.filter(UserRole.name.ilike(f"%{name}%"))
+        query = query.where(UserRole.name.ilike(f"%{name}%"))
     if is_active is not None:
-        query = query.filter(UserRole.is_active == is_active)
+        query = query.where(UserRole.is_active == is_active)
 
-    roles, total = response.paginate_query(query, page, limit)
-    role_ids = [r.id for r in roles]
-    permissions_map = get_role_permissions(db, role_ids)
+    count_key = ("roles", None if user.is_superuser else user.department_id, q, name, is_active)
+
+    if cursor is not None:
+        # Keyset mode: pass an empty cursor for the first page, then next_cursor
+        try:
+            result = await response.paginate_query_cursor(
+                db, query, cursor, limit, order_by=(UserRole.id,), count=count, count_key=count_key)
+        except ValueError:
+            return response.error_response(400, "Invalid cursor")
+
+        pagination = Pagination(
+            current_page=None,
+            total_pages=None if result.total is None else (result.total + limit - 1) // limit,
+            total_records=result.total,
+            total_records_exact=result.total_exact,
+            record_per_page=limit,
+            previous_page_url=None,
+            next_page_url=f"{request.url.path}?cursor={result.next_cursor}&limit={limit}" if result.has_next else None,
+            next_cursor=result.next_cursor,
+        )
+    else:
+        result = await response.paginate_query(
+            db, query.order_by(UserRole.id), page, limit, count=count, count_key=count_key)
+
+        pagination = Pagination(
+            current_page=page,
+            total_pages=None if result.total is None else (result.total + limit - 1) // limit,
+            total_records=result.total,
+            total_records_exact=result.total_exact,
+            record_per_page=limit,
+            previous_page_url=f"{request.url.path}?page={page - 1}&limit={limit}" if page > 1 else None,
+            next_page_url=f"{request.url.path}?page={page + 1}&limit={limit}" if result.has_next else None,
+        )
+
+    roles = result.items
+    permissions_map = {}
+    if fields is None or "permissions" in fields:
+        permissions_map = await get_role_permissions(db, [r.id for r in roles])
 
     formatted_roles = [
-        RoleGet.model_validate(format_role(
-            role, permissions_map.get(role.id, [])))
+        sparse_validate(RoleGet, format_role(
+            role, permissions_map.get(role.id, []), fields), fields)
         for role in roles
     ]
 
-    pagination = Pagination(
-        current_page=page,
-        total_pages=(total + limit - 1) // limit,
-        total_records=total,
-        record_per_page=limit,
-        previous_page_url=f"{request.url.path}?page={page - 1}&limit={limit}" if page > 1 else None,
-        next_page_url=f"{request.url.path}?page={page + 1}&limit={limit}" if (
-            page * limit) < total else None,
+    return response.success_response(200, "success", RoleListResponse(pagination=pagination, roles=formatted_roles))
+
+
+@router.post("/batch-get", response_model=Envelope[RoleBatchGetResponse])
+async def batch_get_roles(
+    data: BatchGetRequest,
+    fields: str = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+    _: None = Depends(has_role_permission(["list_role"])),
+):
+    """
+    Resolve up to `BATCH_GET_MAX_IDS` roles by id in one query, with their permissions.
+    Roles are returned in request order; ids that cannot be resolved are listed in `missing_ids`.
+    """
+    try:
+        fields = parse_fields(fields, RoleGet)
+    except ValueError as e:
+        return response.error_response(400, str(e))
+
+    ids = list(dict.fromkeys(data.ids))
+    query = UserRole.select_active().options(
+        load_columns(UserRole, fields or ROLE_COLUMNS)).where(UserRole.id.in_(ids))
+    if not user.is_superuser:
+        query = query.where(UserRole.department_id == user.department_id)
+    found = {role.id: role for role in await db.scalars(query)}
+
+    permissions_map = {}
+    if fields is None or "permissions" in fields:
+        permissions_map = await get_role_permissions(db, list(found))
+
+    resp_data = RoleBatchGetResponse(
+        roles=[
+            sparse_validate(RoleGet, format_role(found[role_id], permissions_map.get(role_id, []), fields), fields)
+            for role_id in ids if role_id in found
+        ],
+        missing_ids=[role_id for role_id in ids if role_id not in found],
     )
 
-    return response.success_response(200, "success", RoleListResponse(pagination=pagination, roles=formatted_roles))
+    return response.success_response(200, "success", resp_data)
+
+
+ROLE_EXPORT_COLUMNS = ("id", "name", "is_active", "department_id", "created_at", "updated_at", "permissions")
 
 
-@router.get("/{role_id}")
+@router.get("/export")
+async def export_roles(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    user: User = Depends(get_current_user),
+    _: None = Depends(has_role_permission(["list_role"])),
+):
+    """
+    Stream roles with their permission names as NDJSON or CSV.
+    """
+    query = export_roles_query(None if user.is_superuser else user.department_id)
+    sessionmaker = read_sessionmaker(request.headers.get("authorization"))
+    return export_response(iter_roles_with_permissions(query, sessionmaker), ROLE_EXPORT_COLUMNS, format, "roles")
+
+
+@router.get("/{role_id}", response_model=Envelope[SerializeAsAny[RoleGet]])
 async def get_role(
     role_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    http_response: Response,
+    fields: str = None,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["list_role"])),
 ):
-    query = UserRole.get_active(db).filter(UserRole.id == role_id)
+    try:
+        fields = parse_fields(fields, RoleGet)
+    except ValueError as e:
+        return response.error_response(400, str(e))
+
+    version = await role_detail_version(db, role_id)
+    if version and not version.is_deleted and (user.is_superuser or version.department_id == user.department_id):
+        etag = weak_etag("role", role_id, *version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        http_response.headers["ETag"] = etag
+
+    query = UserRole.select_active().options(
+        load_columns(UserRole, fields or ROLE_COLUMNS)).where(UserRole.id == role_id)
 
     if not user.is_superuser:
-        query = query.filter(UserRole.department_id == user.department_id)
+        query = query.where(UserRole.department_id == user.department_id)
 
-    role = query.first()
+    role = await db.scalar(query)
 
     if not role:
         return response.error_response(404, "Role not found")
 
-    permissions_map = get_role_permissions(db, [role.id])
-    formatted_role = format_role(role, permissions_map.get(role.id, []))
+    permissions_map = {}
+    if fields is None or "permissions" in fields:
+        permissions_map = await get_role_permissions(db, [role.id])
+    formatted_role = format_role(role, permissions_map.get(role.id, []), fields)
 
-    resp_data = RoleGet.model_validate(formatted_role)
+    resp_data = sparse_validate(RoleGet, formatted_role, fields)
 
     return response.success_response(200, "Success", resp_data)
 
 
-@router.post("")
+@router.post("", response_model=Envelope[RoleGet])
 async def create_role(
     request: Request,
     data: RoleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["create_role"])),
 ):
     # Check for duplicate role by name
-    if (
-        db.query(UserRole)
-        .filter(
+    if await db.scalar(
+        select(UserRole)
+        .where(
             UserRole.name == data.name,
             UserRole.department_id == user.department_id,
             UserRole.is_deleted == False,
-        ).first()
+        )
     ):
         return response.error_response(400, "UserRole exists with this name")
 
@@ -108,28 +230,28 @@ async def create_role(
         department_id=user.department_id,
     )
     db.add(new_role)
-    db.flush()
+    await db.flush()
     if data.permission_ids:
-        user_permissions = db.query(RolePermission.permission_id).filter(
+        user_permissions = await db.scalars(select(RolePermission.permission_id).where(
             RolePermission.role_id == user.role_id
-        ).all()
-        user_permissions = [
-            permission.permission_id for permission in user_permissions]
+        ))
         if not set(data.permission_ids).issubset(set(user_permissions)):
             return response.error_response(403, "Permission denied")
         try:
             # Add permissions to the role
             new_permissions = [(RolePermission(role_id=new_role.id, permission_id=permission_id))
                                for permission_id in data.permission_ids]
-            db.bulk_save_objects(new_permissions)
+            db.add_all(new_permissions)
+            await db.flush()
         except Exception as e:
             logger.error(f"Error creating Role: {e}")
-            db.rollback()
+            await db.rollback()
             return response.error_response(500, "Error creating Role")
-    db.commit()
-    db.refresh(new_role)
+    await db.commit()
+    permission_catalog.invalidate()
+    invalidate_counts("roles")
 
-    permissions_map = get_role_permissions(db, [new_role.id])
+    permissions_map = await get_role_permissions(db, [new_role.id])
     formatted_role = format_role(
         new_role, permissions_map.get(new_role.id, []))
 
@@ -138,31 +260,30 @@ async def create_role(
     return response.success_response(201, "Role created successfully", resp_data)
 
 
-@router.put("/{role_id}")
+@router.put("/{role_id}", response_model=Envelope[RoleGet])
 async def update_role(
     role_id: int,
     data: RoleUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["update_role"])),
 ):
-    query = UserRole.get_active(db).filter(UserRole.id == role_id)
+    query = UserRole.select_active().where(UserRole.id == role_id)
     if not user.is_superuser:
-        query = query.filter(UserRole.department_id == user.department_id)
-    db_role = query.first()
+        query = query.where(UserRole.department_id == user.department_id)
+    db_role = await db.scalar(query)
     if not db_role:
         return response.error_response(404, "Role not found")
 
     # Check for duplicate UserRole by name (excluding the current UserRole)
-    if (
-        db.query(UserRole)
-        .filter(
+    if await db.scalar(
+        select(UserRole)
+        .where(
             UserRole.name == data.name,
             UserRole.id != role_id,
             UserRole.is_deleted == False,
             UserRole.department_id == user.department_id,
         )
-        .first()
     ):
         return response.error_response(400, "Role exists with this name")
 
@@ -170,74 +291,60 @@ async def update_role(
     db_role.name = data.name
     db_role.updated_at = datetime.now()
 
-    if not data.permission_ids:
-        # Delete existing permissions
-        db.query(RolePermission).filter(
-            RolePermission.role_id == role_id,
-            RolePermission.is_deleted == False
-        ).update({RolePermission.is_active: False, RolePermission.is_deleted: True, RolePermission.updated_at: datetime.now()})
-
-    else:
-        user_permissions = db.query(RolePermission.permission_id).filter(
+    if data.permission_ids:
+        user_permissions = await db.scalars(select(RolePermission.permission_id).where(
             RolePermission.role_id == user.role_id
-        ).all()
-        user_permissions = [
-            permission.permission_id for permission in user_permissions]
+        ))
         if not set(data.permission_ids).issubset(set(user_permissions)):
             return response.error_response(403, "Permission denied")
 
-        try:
-            # Delete existing permissions
-            RolePermission.get_active(db).filter(
-                RolePermission.role_id == role_id
-            ).update(
-                {RolePermission.is_active: False, RolePermission.is_deleted: True,
-                    RolePermission.updated_at: datetime.now()}
-            )
-
-            # Add new permissions
-            new_permissions = [(RolePermission(role_id=role_id, permission_id=permission_id))
-                               for permission_id in data.permission_ids]
-            db.bulk_save_objects(new_permissions)
-        except Exception as e:
-            logger.error(f"Error updating Role: {e}")
-            db.rollback()
-            return response.error_response(500, "Error updating Role")
-    db.commit()
-    db.refresh(db_role)
-
-    permissions_map = get_role_permissions(db, [db_role.id])
+    try:
+        await sync_role_permissions(db, role_id, data.permission_ids or [])
+    except Exception as e:
+        logger.error(f"Error updating Role: {e}")
+        await db.rollback()
+        return response.error_response(500, "Error updating Role")
+    await db.commit()
+    permission_catalog.invalidate()
+    invalidate_counts("roles")
+    role_versions.bump(role_id, role_version(db_role))
+
+    permissions_map = await get_role_permissions(db, [db_role.id])
     formatted_role = format_role(db_role, permissions_map.get(db_role.id, []))
     resp_data = RoleGet.model_validate(formatted_role)
     return response.success_response(200, "Role updated successfully", resp_data)
 
 
-@router.delete("/{role_id}")
+@router.delete("/{role_id}", response_model=Envelope[None])
 async def delete_role(
     role_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["delete_role"])),
 ):
-    query = db.query(UserRole).filter(
+    query = select(UserRole).where(
         UserRole.id == role_id,
         UserRole.is_deleted == False,
     )
     if not user.is_superuser:
-        query = query.filter(UserRole.department_id == user.department_id)
-    db_role = query.first()
+        query = query.where(UserRole.department_id == user.department_id)
+    db_role = await db.scalar(query)
     if not db_role:
         return response.error_response(404, "Role not found")
     try:
         db_role.soft_delete()
         # Delete existing permissions
-        RolePermission.get_active(db).filter(
+        await db.execute(update(RolePermission).where(
             RolePermission.role_id == role_id,
-        ).update({RolePermission.is_active: False, RolePermission.is_deleted: True, RolePermission.updated_at: datetime.now()})
+            RolePermission.is_deleted == False,
+        ).values({RolePermission.is_active: False, RolePermission.is_deleted: True, RolePermission.updated_at: datetime.now()}))
     except Exception as e:
         logger.error(f"Error deleting Role: {e}")
-        db.rollback()
+        await db.rollback()
         return response.error_response(500, "Error deleting Role")
-    db.commit()
+    await db.commit()
+    permission_catalog.invalidate()
+    invalidate_counts("roles")
+    role_versions.bump(role_id, role_version(db_role))
 
     return response.success_response(200, "Role deleted successfully")
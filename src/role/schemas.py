@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, SerializeAsAny
 
 from src.schemas import Pagination
 
@@ -42,4 +42,9 @@ class RoleGet(BaseModel):
 
 class RoleListResponse(BaseModel):
     pagination: Pagination
-    roles: List[RoleGet]
+    roles: List[SerializeAsAny[RoleGet]]  # sparse subclasses when `fields=` is given
+
+
+class RoleBatchGetResponse(BaseModel):
+    roles: List[SerializeAsAny[RoleGet]]
+    missing_ids: List[int]  # not found, deleted or in another department
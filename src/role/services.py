@@ -1,39 +1,124 @@
-from sqlalchemy.orm import Session
+import os
+from datetime import datetime
+from typing import AsyncIterator, FrozenSet, Iterable, Optional
+from dotenv import load_dotenv
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.etag import max_updated_at
+from src.export import iter_rows
+from src.metrics.services import register_metrics
+from src.role.versions import RoleVersionStore
+from src.permission.services import permission_catalog
 
 from src.permission.models import RolePermission, Module, Permission
 from src.user.models import UserRole
 
+load_dotenv()
+
+role_versions = RoleVersionStore(
+    sync_interval=int(os.environ.get("ROLE_VERSION_SYNC_INTERVAL", 5)))
+register_metrics("role_versions", role_versions.stats)
+
+
+async def get_role_permissions(db: AsyncSession, role_ids: list[int]) -> dict[int, list[dict]]:
+    """
+    Each role's active grants grouped by module, read from the permission catalog.
+    Grants of soft-deleted permissions are still listed, as the role can hold them.
+    """
+    catalog = await permission_catalog.get(db)
+    role_permissions = {}
+    for role_id in role_ids:
+        granted = catalog.role_grants.get(role_id)
+        if not granted:
+            continue
+        role_permissions[role_id] = [
+            {
+                "module_id": module.id,
+                "module_name": module.name,
+                "permissions": [
+                    {"permission_id": permission.id, "permission_name": permission.name}
+                    for permission in permissions
+                ],
+            }
+            for module, permissions in catalog.grouped(granted, include_deleted=True)
+        ]
+    return role_permissions
+
+
+async def sync_role_permissions(db: AsyncSession, role_id: int, permission_ids: Iterable[int]) -> dict:
+    """
+    Make the role's active permissions equal `permission_ids`, touching only what changed:
+    removed rows are soft-deleted, re-added ones revive a soft-deleted row and the
+    rest are inserted, each in one statement. Does not commit.
+    """
+    wanted = set(permission_ids)
+    active = set()
+    deleted_rows = {}
+    for row in await db.execute(
+        select(RolePermission.id, RolePermission.permission_id, RolePermission.is_deleted)
+        .where(RolePermission.role_id == role_id)
+    ):
+        if not row.is_deleted:
+            active.add(row.permission_id)
+        elif row.permission_id in wanted:
+            deleted_rows[row.permission_id] = max(row.id, deleted_rows.get(row.permission_id, 0))
+
+    removed = active - wanted
+    added = wanted - active
+    revived = [deleted_rows[pid] for pid in added if pid in deleted_rows]
+    inserted = [pid for pid in added if pid not in deleted_rows]
+    now = datetime.now()
+
+    if removed:
+        await db.execute(update(RolePermission).where(
+            RolePermission.role_id == role_id,
+            RolePermission.permission_id.in_(removed),
+            RolePermission.is_deleted == False,
+        ).values({RolePermission.is_active: False, RolePermission.is_deleted: True, RolePermission.updated_at: now}))
+    if revived:
+        await db.execute(update(RolePermission).where(
+            RolePermission.id.in_(revived),
+        ).values({RolePermission.is_active: True, RolePermission.is_deleted: False, RolePermission.updated_at: now}))
+    if inserted:
+        await db.execute(insert(RolePermission), [
+            {"role_id": role_id, "permission_id": pid} for pid in inserted])
 
-def get_role_permissions(db: Session, role_ids: list[int]) -> dict[int, list[dict]]:
+    return {"removed": len(removed), "revived": len(revived), "inserted": len(inserted)}
+
+
+def export_roles_query(department_id: int = None):
+    """
+    Role columns outer-joined to their permission names, ordered by role so that
+    `iter_roles_with_permissions` can group consecutive rows.
+    """
     query = (
-        db.query(
-            RolePermission.role_id,
-            RolePermission.is_deleted,
-            Module.id.label("module_id"),
-            Module.name.label("module_name"),
-            Permission.id.label("permission_id"),
-            Permission.name.label("permission_name"),
+        select(
+            UserRole.id, UserRole.name, UserRole.is_active, UserRole.department_id,
+            UserRole.created_at, UserRole.updated_at, Permission.name.label("permission_name"),
         )
+        .outerjoin(RolePermission, (RolePermission.role_id == UserRole.id) & (RolePermission.is_deleted == False))
         .outerjoin(Permission, RolePermission.permission_id == Permission.id)
-        .outerjoin(Module, Permission.module_id == Module.id)
-        .filter(RolePermission.role_id.in_(role_ids))
-        .filter(RolePermission.is_deleted == False)
-        .order_by(Module.id.asc(), Permission.id.asc())
-        .all()
+        .where(UserRole.is_deleted == False)
+        .order_by(UserRole.id, Permission.id)
     )
+    if department_id is not None:
+        query = query.where(UserRole.department_id == department_id)
+    return query
 
-    role_permissions = {}
-    for perm in query:
-        role_permissions.setdefault(perm.role_id, {}).setdefault(perm.module_id, {
-            "module_id": perm.module_id,
-            "module_name": perm.module_name,
-            "permissions": [],
-        })["permissions"].append({
-            "permission_id": perm.permission_id,
-            "permission_name": perm.permission_name,
-        })
 
-    return {rid: list(modules.values()) for rid, modules in role_permissions.items()}
+async def iter_roles_with_permissions(query, sessionmaker: async_sessionmaker) -> AsyncIterator[dict]:
+    role = None
+    async for row in iter_rows(query, sessionmaker):
+        permission_name = row.pop("permission_name")
+        if role is None or row["id"] != role["id"]:
+            if role is not None:
+                yield role
+            role = {**row, "permissions": []}
+        if permission_name is not None:
+            role["permissions"].append(permission_name)
+    if role is not None:
+        yield role
 
 
 def group_permissions_by_module(permissions_query):
@@ -52,12 +137,32 @@ def group_permissions_by_module(permissions_query):
     return list(permissions_by_module.values())
 
 
-def format_role(role: UserRole, permissions: list[dict]):
-    return {
-        "id": role.id,
-        "name": role.name,
-        "is_active": role.is_active,
-        "created_at": role.created_at,
-        "updated_at": role.updated_at,
-        "permissions": permissions,
-    }
+async def role_detail_version(db: AsyncSession, role_id: int):
+    """
+    Everything `GET /roles/{id}` renders can change through the role row, its grants, or
+    the names of the granted permissions and modules; read their latest writes in one query.
+    Returns None when the role does not exist.
+    """
+    return (await db.execute(
+        select(
+            UserRole.department_id,
+            UserRole.is_deleted,
+            UserRole.updated_at,
+            max_updated_at(RolePermission, RolePermission.role_id == role_id),
+            max_updated_at(Permission),
+            max_updated_at(Module),
+        ).where(UserRole.id == role_id)
+    )).one_or_none()
+
+
+ROLE_COLUMNS = ("id", "name", "is_active", "created_at", "updated_at")
+
+
+def format_role(role: UserRole, permissions: list[dict], fields: Optional[FrozenSet[str]] = None):
+    """
+    `RoleGet` data for a role, limited to `fields` when given so unloaded columns are not read.
+    """
+    data = {name: getattr(role, name) for name in ROLE_COLUMNS if fields is None or name in fields}
+    if fields is None or "permissions" in fields:
+        data["permissions"] = permissions
+    return data
@@ -0,0 +1,71 @@
+import time
+import asyncio
+from typing import Dict, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.database import primary_session
+from src.user.models import UserRole
+
+
+def role_version(role: Optional[UserRole]) -> int:
+    """
+    A role's version is its `updated_at` in microseconds, which every role write bumps.
+    """
+    if role is None or role.updated_at is None:
+        return 0
+    return int(role.updated_at.timestamp() * 1_000_000)
+
+
+class RoleVersionStore:
+    """
+    In-memory role versions, kept in sync with `user_roles` by an `updated_at` watermark.
+    Syncs read the primary, since a lagging replica would let the watermark pass unseen rows.
+    """
+
+    def __init__(self, sync_interval: float = 5, sync_overlap: float = 5):
+        self.sync_interval = sync_interval
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+        self.syncs = 0
+        self._versions: Dict[int, int] = {}
+        self._watermark: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._lock = asyncio.Lock()
+
+    def bump(self, role_id: int, version: int):
+        self._versions[role_id] = max(self._versions.get(role_id, 0), version)
+
+    async def sync(self, db: AsyncSession, force: bool = False):
+        if not force and (time.monotonic() < self._next_sync or self._lock.locked()):
+            return
+        async with self._lock:
+            started_at = datetime.now()
+            query = select(UserRole.id, UserRole.updated_at)
+            if self._watermark is not None:
+                query = query.where(
+                    UserRole.updated_at >= self._watermark - self.sync_overlap)
+
+            async with primary_session(db) as primary:
+                for row in await primary.execute(query):
+                    self.bump(row.id, role_version(row))
+
+            self._watermark = started_at
+            self._next_sync = time.monotonic() + self.sync_interval
+            self.syncs += 1
+
+    async def is_current(self, db: AsyncSession, role_id: int, version: int) -> bool:
+        await self.sync(db)
+        known = self._versions.get(role_id)
+        if known is None or known < version:
+            # The token was minted from a newer role than this worker has seen
+            await self.sync(db, force=True)
+            known = self._versions.get(role_id)
+        return known == version
+
+    def stats(self) -> dict:
+        return {
+            "roles": len(self._versions),
+            "syncs": self.syncs,
+            "sync_interval": self.sync_interval,
+        }
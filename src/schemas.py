@@ -1,11 +1,36 @@
-from typing import Optional
-from pydantic import BaseModel
+import os
+from dotenv import load_dotenv
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+load_dotenv()
+
+# Most ids a single batch-get request may resolve
+BATCH_GET_MAX_IDS = int(os.environ.get("BATCH_GET_MAX_IDS", 100))
+
+T = TypeVar("T")
 
 
 class Pagination(BaseModel):
-    current_page: int
-    total_pages: int
-    total_records: int
+    current_page: Optional[int]  # None in cursor mode
+    total_pages: Optional[int]  # None when the count is skipped
+    total_records: Optional[int]
+    total_records_exact: bool = True  # False when skipped or served from the count cache
     record_per_page: int
     previous_page_url: Optional[str]
-    next_page_url: Optional[str]
\ No newline at end of file
+    next_page_url: Optional[str]
+    next_cursor: Optional[str] = None
+
+
+class Envelope(BaseModel, Generic[T]):
+    """
+    Body of every JSON response. Declared as `response_model=Envelope[...]` so FastAPI
+    validates and serializes it with pydantic-core in one pass.
+    """
+    status: int
+    message: str
+    data: Optional[T] = None
+
+
+class BatchGetRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_GET_MAX_IDS)
@@ -0,0 +1,44 @@
+from typing import List
+from sqlalchemy import and_, literal_column, or_, select, table, column, true
+from sqlalchemy.dialects.mysql import match
+
+from configs.database import DB_TYPE
+
+# Columns covered by the full-text index of each table (see the full_text_search migration)
+SEARCH_COLUMNS = {
+    "users": ("name", "email", "phone"),
+    "user_roles": ("name",),
+    "departments": ("name",),
+}
+
+# Shortest term the index can answer: FTS5 trigrams on SQLite, ngram_token_size (2) on MySQL
+MIN_TERM_LENGTH = 2 if DB_TYPE == "mysql" else 3
+
+
+def search_terms(q: str) -> List[str]:
+    return [term for term in q.replace('"', " ").split() if term]
+
+
+def search_filter(model, q: str):
+    """
+    Rows of `model` matching every whitespace-separated term of `q` as a substring
+    of any searchable column, answered from the full-text index.
+    """
+    columns = [getattr(model, name) for name in SEARCH_COLUMNS[model.__tablename__]]
+    terms = search_terms(q)
+    if not terms:
+        return true()
+
+    if any(len(term) < MIN_TERM_LENGTH for term in terms):
+        # Too short for the index to answer, so fall back to a scan
+        return and_(*(or_(*(col.ilike(f"%{term}%") for col in columns)) for term in terms))
+
+    if DB_TYPE == "mysql":
+        return match(*columns, against=" ".join(f'+"{term}"' for term in terms)).in_boolean_mode()
+
+    fts_name = f"{model.__tablename__}_fts"
+    fts = table(fts_name, column("rowid"))
+    return model.id.in_(
+        select(fts.c.rowid).where(
+            literal_column(fts_name).op("MATCH")(" ".join(f'"{term}"' for term in terms)))
+    )
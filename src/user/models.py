@@ -1,17 +1,21 @@
-from sqlalchemy.orm import relationship
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index
 
 from src.models import AbstractBase
 
 
 class User(AbstractBase):
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_department_id_is_deleted', 'department_id', 'is_deleted'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
     email = Column(String(100), nullable=True, unique=True)
     phone = Column(String(15), nullable=False, unique=True)
-    password = Column(String(255), nullable=False)
+    # Only login and password reset read the hash; load it with undefer(User.password)
+    password = deferred(Column(String(255), nullable=False))
     role_id = Column(Integer, ForeignKey('user_roles.id'), nullable=True)
     department_id = Column(Integer, ForeignKey(
         'departments.id'), nullable=True)
@@ -26,6 +30,10 @@ class User(AbstractBase):
 
 class UserRole(AbstractBase):
     __tablename__ = 'user_roles'
+    __table_args__ = (
+        Index('ix_user_roles_department_id_name_is_deleted', 'department_id', 'name', 'is_deleted'),
+        Index('ix_user_roles_updated_at', 'updated_at'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
@@ -1,63 +1,120 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import SerializeAsAny
+from typing import FrozenSet, Literal, Optional
 from fastapi import APIRouter, Request, Depends
 
-from configs.database import get_db
-from src.helpers import ResponseHelper
-from src.auth.utils import hash_password
+from configs.database import get_async_db, get_read_db, read_sessionmaker
+from src.helpers import ResponseHelper, invalidate_counts
+from src.search import search_filter
+from src.fields import parse_fields, sparse_validate, load_columns
+from src.export import export_response, iter_rows
+from src.auth.utils import hash_password_async
 from src.auth.dependencies import get_current_user, has_role_permission
 
 from src.user.models import User, UserRole
-from src.schemas import Pagination
-from src.user.schemas import UserGet, UserListResponse, UserCreate, UserUpdate
+from src.department.models import Department
+from src.schemas import BatchGetRequest, Envelope, Pagination
+from src.user.schemas import (
+    UserGet, UserListResponse, UserCreate, UserUpdate, UserImportResponse, UserBatchGetResponse)
+from src.user.services import UserImporter, iter_lines
 
 router = APIRouter(prefix="/users", tags=["Users"])
 response = ResponseHelper()
 
 
-@router.get("")
+def user_load_options(fields: Optional[FrozenSet[str]] = None) -> list:
+    """
+    Load only the columns and relationships behind the requested `UserGet` fields.
+    Relationships cannot be lazy-loaded on an AsyncSession, so they are joined here.
+    """
+    fields = fields or UserGet.model_fields.keys()
+    options = [load_columns(User, fields)]
+    if "role" in fields:
+        options.append(joinedload(User.role).load_only(UserRole.id, UserRole.name))
+    if "department" in fields:
+        options.append(joinedload(User.department).load_only(Department.id, Department.name))
+    return options
+
+
+@router.get("", response_model=Envelope[UserListResponse])
 async def get_users(
     request: Request,
     page: int = 1,
     limit: int = 10,
+    cursor: str = None,
+    count: Literal["exact", "none", "cached"] = "exact",
+    q: str = None,
     name: str = None,
     email: str = None,
     phone: str = None,
     role_id: int = None,
     is_active: bool = None,
-    db: Session = Depends(get_db),
+    fields: str = None,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["list_user"])),
 ):
-    query = User.get_active(db).filter(
+    try:
+        fields = parse_fields(fields, UserGet)
+    except ValueError as e:
+        return response.error_response(400, str(e))
+
+    query = User.select_active().options(*user_load_options(fields)).where(
         User.department_id == user.department_id)
 
+    if q:
+        query = query.where(search_filter(User, q))
     if name:
-        query = query.filter(User.name.ilike(f"%{name}%"))
+        query = query.where(User.name.ilike(f"%{name}%"))
     if email:
-        query = query.filter(User.email.ilike(f"%{email}%"))
+        query = query.where(User.email.ilike(f"%{email}%"))
     if phone:
-        query = query.filter(User.phone.ilike(f"%{phone}%"))
+        query = query.where(User.phone.ilike(f"%{phone}%"))
     if role_id is not None:
-        query = query.filter(User.role_id == role_id)
+        query = query.where(User.role_id == role_id)
     if is_active is not None:
-        query = query.filter(User.is_active == is_active)
+        query = query.where(User.is_active == is_active)
 
-    users, total = response.paginate_query(query, page, limit)
+    base_url = str(request.url.path)
+    count_key = ("users", user.department_id, q, name, email, phone, role_id, is_active)
 
-    formatted_users = [UserGet.model_validate(user) for user in users]
+    if cursor is not None:
+        # Keyset mode: pass an empty cursor for the first page, then next_cursor
+        try:
+            result = await response.paginate_query_cursor(
+                db, query, cursor, limit, order_by=(User.id,), count=count, count_key=count_key)
+        except ValueError:
+            return response.error_response(400, "Invalid cursor")
 
-    base_url = str(request.url.path)
+        pagination_data = Pagination(
+            current_page=None,
+            total_pages=None if result.total is None else (result.total + limit - 1) // limit,
+            total_records=result.total,
+            total_records_exact=result.total_exact,
+            record_per_page=limit,
+            previous_page_url=None,
+            next_page_url=f"{base_url}?cursor={result.next_cursor}&limit={limit}" if result.has_next else None,
+            next_cursor=result.next_cursor,
+        )
+    else:
+        result = await response.paginate_query(
+            db, query.order_by(User.id), page, limit, count=count, count_key=count_key)
+
+        pagination_data = Pagination(
+            current_page=page,
+            total_pages=None if result.total is None else (result.total + limit - 1) // limit,
+            total_records=result.total,
+            total_records_exact=result.total_exact,
+            record_per_page=limit,
+            previous_page_url=f"{base_url}?page={page - 1}&limit={limit}" if page > 1 else None,
+            next_page_url=f"{base_url}?page={page + 1}&limit={limit}" if result.has_next else None,
+        )
+
+    formatted_users = [sparse_validate(UserGet, user, fields) for user in result.items]
 
-    pagination_data = Pagination(
-        current_page=page,
-        total_pages=total // limit + (1 if total % limit else 0),
-        total_records=total,
-        record_per_page=limit,
-        previous_page_url=f"{base_url}?page={page - 1}&limit={limit}" if page > 1 else None,
-        next_page_url=f"{request.url.path}?page={page + 1}&limit={limit}" if (
-            page * limit) < total else None,
-    )
     resp_data = UserListResponse(
         users=formatted_users,
         pagination=pagination_data
@@ -66,92 +123,189 @@ async def get_users(
     return response.success_response(200, "success", data=resp_data)
 
 
-@router.get("/{user_id}")
+@router.post("/batch-get", response_model=Envelope[UserBatchGetResponse])
+async def batch_get_users(
+    data: BatchGetRequest,
+    fields: str = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+    _: None = Depends(has_role_permission(["list_user"])),
+):
+    """
+    Resolve up to `BATCH_GET_MAX_IDS` users of the department by id in one query.
+    Users are returned in request order; ids that cannot be resolved are listed in `missing_ids`.
+    """
+    try:
+        fields = parse_fields(fields, UserGet)
+    except ValueError as e:
+        return response.error_response(400, str(e))
+
+    ids = list(dict.fromkeys(data.ids))
+    found = {db_user.id: db_user for db_user in await db.scalars(
+        User.select_active().options(*user_load_options(fields)).where(
+            User.id.in_(ids),
+            User.department_id == user.department_id,
+        )
+    )}
+
+    resp_data = UserBatchGetResponse(
+        users=[sparse_validate(UserGet, found[user_id], fields) for user_id in ids if user_id in found],
+        missing_ids=[user_id for user_id in ids if user_id not in found],
+    )
+
+    return response.success_response(200, "success", resp_data)
+
+
+USER_EXPORT_COLUMNS = (
+    "id", "name", "email", "phone", "is_active", "role_id", "role_name",
+    "department_id", "created_at", "updated_at",
+)
+
+
+@router.get("/export")
+async def export_users(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    q: str = None,
+    is_active: bool = None,
+    user: User = Depends(get_current_user),
+    _: None = Depends(has_role_permission(["list_user"])),
+):
+    """
+    Stream the department's users as NDJSON or CSV.
+    """
+    query = (
+        select(
+            User.id, User.name, User.email, User.phone, User.is_active, User.role_id,
+            UserRole.name.label("role_name"), User.department_id, User.created_at, User.updated_at,
+        )
+        .outerjoin(UserRole, User.role_id == UserRole.id)
+        .where(User.department_id == user.department_id, User.is_deleted == False)
+        .order_by(User.id)
+    )
+    if q:
+        query = query.where(search_filter(User, q))
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+
+    sessionmaker = read_sessionmaker(request.headers.get("authorization"))
+    return export_response(iter_rows(query, sessionmaker), USER_EXPORT_COLUMNS, format, "users")
+
+
+@router.get("/{user_id}", response_model=Envelope[SerializeAsAny[UserGet]])
 async def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    fields: str = None,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["list_user"])),
 ):
-    query = User.get_active(db).filter(
+    try:
+        fields = parse_fields(fields, UserGet)
+    except ValueError as e:
+        return response.error_response(400, str(e))
+
+    query = User.select_active().options(*user_load_options(fields)).where(
         User.id == user_id,
         User.department_id == user.department_id
     )
-    db_user = query.first()
+    db_user = await db.scalar(query)
     if not db_user:
         return response.error_response(404, "User not found")
-    resp_data = UserGet.model_validate(db_user)
+    resp_data = sparse_validate(UserGet, db_user, fields)
 
     return response.success_response(200, "User fetched successfully", resp_data)
 
 
-@router.post("")
+@router.post("", response_model=Envelope[UserGet])
 async def create_user(
     request: Request,
     data: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["create_user"])),
 ):
-    db_user = db.query(User).filter(
+    db_user = await db.scalar(select(User).where(
         (User.email == data.email) | (User.phone == data.phone)
-    ).first()
+    ))
     if db_user:
         return response.error_response(400, "Account already exists with the email or phone")
 
-    if not db.query(UserRole).filter(
+    if not await db.scalar(select(UserRole).where(
         UserRole.department_id == user.department_id,
         UserRole.id == data.role_id
-    ).first():
+    )):
         return response.error_response(404, "Role not found")
 
     new_user = User(
         name=data.name,
         phone=data.phone,
         email=data.email,
-        password=hash_password(data.password),
+        password=await hash_password_async(data.password),
         role_id=data.role_id,
         department_id=user.department_id
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    invalidate_counts("users")
+    await db.refresh(new_user, ["role", "department"])
 
     resp_data = UserGet.model_validate(new_user)
 
     return response.success_response(201, "User created successfully", resp_data)
 
 
-@router.put("/{user_id}")
+@router.post("/bulk", response_model=Envelope[UserImportResponse])
+async def bulk_create_users(
+    request: Request,
+    format: Literal["ndjson", "csv"] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user),
+    _: None = Depends(has_role_permission(["create_user"])),
+):
+    """
+    Import users from an NDJSON or CSV body (one user per line, CSV with a header row).
+    The format defaults from the Content-Type. Rows are imported in chunks and
+    failed rows are reported by line number.
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    importer = UserImporter(db, user.department_id)
+    result = await importer.run(iter_lines(request.stream()), format)
+
+    return response.success_response(200, "Users imported", UserImportResponse(**result))
+
+
+@router.put("/{user_id}", response_model=Envelope[UserGet])
 async def update_user(
     user_id: int,
     data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["update_user"])),
 ):
-    db_user = db.query(User).filter(
+    db_user = await db.scalar(select(User).where(
         User.id == user_id,
         User.department_id == user.department_id,
         User.is_deleted == False
-    ).first()
+    ))
     if not db_user:
         return response.error_response(404, "User not found")
 
-    if not db.query(UserRole).filter(
+    if not await db.scalar(select(UserRole).where(
         UserRole.department_id == user.department_id,
         UserRole.id == data.role_id
-    ).first():
+    )):
         return response.error_response(404, "Role not found")
 
     # Check for duplicate users by email or phone (excluding the current user)
-    if (
-        db.query(User)
-        .filter(
+    if await db.scalar(
+        select(User)
+        .where(
             (User.phone == data.phone) | (User.email == data.email),
             User.id != user_id
         )
-        .first()
     ):
         return response.error_response(400, "Account exists with this phone or email")
 
@@ -161,29 +315,31 @@ async def update_user(
     db_user.role_id = data.role_id
     db_user.department_id = user.department_id
     db_user.updated_at = datetime.now()
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    invalidate_counts("users")
+    await db.refresh(db_user, ["role", "department"])
 
     resp_data = UserGet.model_validate(db_user)
 
     return response.success_response(200, "User updated successfully", resp_data)
 
 
-@router.delete("/{user_id}")
+@router.delete("/{user_id}", response_model=Envelope[None])
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
     _: None = Depends(has_role_permission(["delete_user"])),
 ):
-    db_user = User.get_active(db).filter(
+    db_user = await db.scalar(User.select_active().where(
         User.id == user_id,
         User.department_id == user.department_id
-    ).first()
+    ))
     if not db_user:
         return response.error_response(404, "User not found")
 
     db_user.soft_delete()
-    db.commit()
+    await db.commit()
+    invalidate_counts("users")
 
     return response.success_response(200, "User deleted successfully")
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, SerializeAsAny
 
 from src.schemas import Pagination
 
@@ -51,4 +51,20 @@ class UserGet(UserBase):
 
 class UserListResponse(BaseModel):
     pagination: Pagination
-    users: List[UserGet]
+    users: List[SerializeAsAny[UserGet]]  # sparse subclasses when `fields=` is given
+
+
+class UserBatchGetResponse(BaseModel):
+    users: List[SerializeAsAny[UserGet]]
+    missing_ids: List[int]  # not found, deleted or in another department
+
+
+class UserImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+
+class UserImportResponse(BaseModel):
+    created: int
+    failed: int
+    errors: List[UserImportError]
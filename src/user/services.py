@@ -0,0 +1,234 @@
+import os
+import csv
+import json
+import asyncio
+from dotenv import load_dotenv
+from typing import AsyncIterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.utils import hash_password
+from src.helpers import invalidate_counts
+
+from src.user.models import User, UserRole
+from src.user.schemas import UserCreate
+
+load_dotenv()
+
+BULK_IMPORT_CHUNK_SIZE = int(os.environ.get("BULK_IMPORT_CHUNK_SIZE", 1000))
+BULK_IMPORT_HASH_WORKERS = int(os.environ.get("BULK_IMPORT_HASH_WORKERS", os.cpu_count() or 1))
+
+DUPLICATE_ACCOUNT = "Account already exists with the email or phone"
+
+_hash_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(max_workers=BULK_IMPORT_HASH_WORKERS)
+    return _hash_executor
+
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    return [hash_password(password) for password in passwords]
+
+
+async def read_file_chunks(path: str, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+def decode_line(line: bytes) -> Optional[str]:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+    """
+    Split a byte stream into decoded lines without holding more than one line in memory.
+    A line that is not valid UTF-8 is yielded as None, so it can be reported by line number.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield decode_line(line)
+    if buffer:
+        yield decode_line(buffer)
+
+
+async def iter_records(lines: AsyncIterator[Optional[str]], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yield (line number, record, error) for each non-blank line. CSV input needs a
+    header row and one record per line.
+    """
+    header = None
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if line is None:
+            yield line_no, None, "Invalid UTF-8"
+            continue
+        if line_no == 1:
+            line = line.lstrip("\ufeff")
+        if not line.strip():
+            continue
+
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+            elif len(values) != len(header):
+                yield line_no, None, f"Expected {len(header)} columns, got {len(values)}"
+            else:
+                yield line_no, dict(zip(header, values)), None
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_no, None, "Invalid JSON"
+                continue
+            if isinstance(record, dict):
+                yield line_no, record, None
+            else:
+                yield line_no, None, "Expected a JSON object"
+
+
+class UserImporter:
+    """
+    Imports users into one department in chunks: each chunk is validated, checked for
+    existing accounts with one query, hashed across a process pool and inserted in one batch.
+    """
+
+    def __init__(self, db: AsyncSession, department_id: int, chunk_size: int = BULK_IMPORT_CHUNK_SIZE):
+        self.db = db
+        self.department_id = department_id
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.errors = []
+        self._role_ids = None
+        self._seen_emails = set()
+        self._seen_phones = set()
+
+    def fail(self, line_no: int, errors: List[str]):
+        self.errors.append({"line": line_no, "errors": errors})
+
+    def result(self) -> dict:
+        errors = sorted(self.errors, key=lambda error: error["line"])
+        return {"created": self.created, "failed": len(errors), "errors": errors}
+
+    async def run(self, lines: AsyncIterator[Optional[str]], fmt: str = "ndjson") -> dict:
+        self._role_ids = set(await self.db.scalars(
+            select(UserRole.id).where(UserRole.department_id == self.department_id)))
+
+        chunk = []
+        async for line_no, record, error in iter_records(lines, fmt):
+            if error:
+                self.fail(line_no, [error])
+                continue
+            chunk.append((line_no, record))
+            if len(chunk) >= self.chunk_size:
+                await self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            await self.import_chunk(chunk)
+
+        if self.created:
+            invalidate_counts("users")
+        return self.result()
+
+    def validate(self, chunk: List[Tuple[int, dict]]) -> List[Tuple[int, UserCreate]]:
+        valid = []
+        for line_no, record in chunk:
+            try:
+                # Empty CSV cells fall back to the schema defaults
+                data = UserCreate.model_validate({k: v for k, v in record.items() if v != ""})
+            except ValidationError as e:
+                self.fail(line_no, [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()])
+                continue
+            if data.role_id not in self._role_ids:
+                self.fail(line_no, ["Role not found"])
+                continue
+            if data.email in self._seen_emails or data.phone in self._seen_phones:
+                self.fail(line_no, ["Duplicate email or phone in the import"])
+                continue
+            self._seen_emails.add(data.email)
+            self._seen_phones.add(data.phone)
+            valid.append((line_no, data))
+        return valid
+
+    async def hash(self, passwords: List[str]) -> List[str]:
+        loop = asyncio.get_running_loop()
+        executor = get_hash_executor()
+        size = max(1, -(-len(passwords) // BULK_IMPORT_HASH_WORKERS))
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(executor, hash_passwords, passwords[i:i + size])
+            for i in range(0, len(passwords), size)
+        ))
+        return [hashed for part in parts for hashed in part]
+
+    async def import_chunk(self, chunk: List[Tuple[int, dict]]):
+        valid = self.validate(chunk)
+        if not valid:
+            return
+
+        taken = (await self.db.execute(select(User.email, User.phone).where(or_(
+            User.email.in_([data.email for _, data in valid]),
+            User.phone.in_([data.phone for _, data in valid]),
+        )))).all()
+        taken_emails = {row.email for row in taken}
+        taken_phones = {row.phone for row in taken}
+
+        rows = []
+        for line_no, data in valid:
+            if data.email in taken_emails or data.phone in taken_phones:
+                self.fail(line_no, [DUPLICATE_ACCOUNT])
+            else:
+                rows.append((line_no, data))
+        if not rows:
+            return
+
+        hashed_passwords = await self.hash([data.password for _, data in rows])
+        values = [
+            {
+                "name": data.name,
+                "phone": data.phone,
+                "email": data.email,
+                "password": hashed,
+                "role_id": data.role_id,
+                "is_active": data.is_active,
+                "department_id": self.department_id,
+            }
+            for (_, data), hashed in zip(rows, hashed_passwords)
+        ]
+
+        try:
+            await self.db.execute(insert(User), values)
+            await self.db.commit()
+            self.created += len(values)
+        except IntegrityError:
+            await self.db.rollback()
+            # A concurrent write took one of the accounts; insert row by row to find it
+            for (line_no, _), value in zip(rows, values):
+                try:
+                    await self.db.execute(insert(User), [value])
+                    await self.db.commit()
+                    self.created += 1
+                except IntegrityError:
+                    await self.db.rollback()
+                    self.fail(line_no, [DUPLICATE_ACCOUNT])
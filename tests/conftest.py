@@ -0,0 +1,83 @@
+import os
+import uuid
+import tempfile
+from typing import NamedTuple
+
+import pytest
+from alembic import command
+from alembic.config import Config
+
+# configs.database reads these at import time, so they are set before any test imports it
+_tmp = tempfile.mkdtemp(prefix="user-management-tests-")
+os.environ["DB_TYPE"] = "sqlite"
+os.environ["SQLITE_DB_PATH"] = os.path.join(_tmp, "test.db")
+os.environ["SQLITE_REPLICA_PATHS"] = ""
+os.environ["LOG_DIR"] = os.path.join(_tmp, "logs")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def schema():
+    """
+    The test database, built by running the Alembic migrations to head.
+    """
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    command.upgrade(config, "head")
+
+
+class Tenant(NamedTuple):
+    department_id: int
+    user_id: int
+    headers: dict
+
+    def add_users(self, count: int, **values) -> list:
+        """
+        Insert `count` users into the department and return their ids in insertion order.
+        """
+        from configs.database import SessionLocal
+        from src.user.models import User
+
+        with SessionLocal() as db:
+            users = []
+            for _ in range(count):
+                tag = uuid.uuid4().hex[:12]
+                users.append(User(name=f"user {tag}", email=f"{tag}@test", phone=tag, password="x",
+                                  department_id=self.department_id, **values))
+            db.add_all(users)
+            db.commit()
+            return [user.id for user in users]
+
+
+@pytest.fixture(scope="session")
+def client(schema):
+    from fastapi.testclient import TestClient
+
+    import app
+    return TestClient(app.app)
+
+
+@pytest.fixture
+def tenant(schema) -> Tenant:
+    """
+    A fresh department with a superuser in it, and headers carrying the superuser's token.
+    """
+    from configs.database import SessionLocal
+    from src.auth.utils import create_access_token
+    from src.department.models import Department
+    from src.user.models import User
+
+    tag = uuid.uuid4().hex[:12]
+    with SessionLocal() as db:
+        department = Department(name=f"tenant {tag}")
+        db.add(department)
+        db.flush()
+        superuser = User(name="admin", email=f"admin-{tag}@test", phone=tag, password="x",
+                         is_superuser=True, department_id=department.id)
+        db.add(superuser)
+        db.commit()
+        token = create_access_token(data={"user_id": superuser.id, "phone": tag}, jti=str(uuid.uuid4()))
+        return Tenant(department.id, superuser.id, {"Authorization": f"Bearer {token}"})
+
@@ -0,0 +1,70 @@
+"""
+API keys stay cached after validation, but a key deactivated or deleted in the
+database stops working at the next sync instead of after the cache TTL.
+"""
+import asyncio
+import secrets
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from configs.database import AsyncSessionLocal, SessionLocal
+from src.auth import dependencies
+from src.auth.exceptions import APIKeyException
+from src.auth.revocation import ApiKeyCache
+from src.auth.utils import hash_api_key
+
+from src.auth.models import ApiKey
+
+pytestmark = pytest.mark.usefixtures("schema")
+
+
+def new_key() -> str:
+    key = secrets.token_urlsafe(32)
+    with SessionLocal() as db:
+        db.add(ApiKey(key_hash=hash_api_key(key)))
+        db.commit()
+    return key
+
+
+def change_key(key: str, **values):
+    with SessionLocal() as db:
+        db.execute(update(ApiKey).where(ApiKey.key_hash == hash_api_key(key)).values(
+            updated_at=datetime.now(), **values))
+        db.commit()
+
+
+async def authenticate(key: str):
+    async with AsyncSessionLocal() as db:
+        return await dependencies.get_api_key(api_key=f"Bearer {key}", db=db)
+
+
+@pytest.mark.parametrize("values", [{"is_active": False}, {"is_deleted": True}])
+def test_cached_key_rejected_after_deactivation(monkeypatch, values):
+    key = new_key()
+    cache = ApiKeyCache(ttl=300, sync_interval=0)
+    monkeypatch.setattr(dependencies, "api_key_cache", cache)
+
+    assert asyncio.run(authenticate(key)).key_hash == hash_api_key(key)
+    assert cache.get(hash_api_key(key)) is not None
+
+    change_key(key, **values)
+    with pytest.raises(APIKeyException) as exc:
+        asyncio.run(authenticate(key))
+    assert exc.value.status == 403
+    assert cache.get(hash_api_key(key)) is None
+
+
+def test_other_cached_keys_survive_a_revocation(monkeypatch):
+    kept, revoked = new_key(), new_key()
+    cache = ApiKeyCache(ttl=300, sync_interval=0)
+    monkeypatch.setattr(dependencies, "api_key_cache", cache)
+    asyncio.run(authenticate(kept))
+    asyncio.run(authenticate(revoked))
+
+    change_key(revoked, is_active=False)
+    asyncio.run(authenticate(kept))
+
+    assert cache.get(hash_api_key(kept)) is not None
+    assert cache.get(hash_api_key(revoked)) is None
@@ -0,0 +1,85 @@
+"""
+Rows soft-deleted past the retention period move to the archive tables and can be
+restored unchanged; rows still referenced from hot tables stay where they are.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from configs.database import SessionLocal
+from src.archive.models import ARCHIVE_TABLES
+from src.archive.services import archive_deleted_rows, restore_archived_rows
+
+from src.permission.models import Module, Permission, RolePermission
+from src.user.models import User, UserRole
+
+RETENTION = timedelta(days=30)
+EXPIRED = datetime.now() - timedelta(days=60)
+
+
+def locate(table_name: str, row_id: int):
+    """
+    Returns ("hot" or "archive", row) for the row with `row_id`.
+    """
+    hot, archive = ARCHIVE_TABLES[table_name]
+    with SessionLocal() as db:
+        for where, table in (("hot", hot), ("archive", archive)):
+            row = db.execute(select(table).where(table.c.id == row_id)).mappings().first()
+            if row is not None:
+                return where, dict(row)
+    return None, None
+
+
+@pytest.fixture
+def deleted_role(tenant):
+    """
+    A role and its grant, both soft-deleted past the retention period.
+    """
+    with SessionLocal() as db:
+        module = Module(name=f"archive {tenant.department_id}")
+        db.add(module)
+        db.flush()
+        permission = Permission(name=f"archive_{tenant.department_id}", module_id=module.id)
+        role = UserRole(name="archived", department_id=tenant.department_id, is_deleted=True, updated_at=EXPIRED)
+        db.add_all([permission, role])
+        db.flush()
+        grant = RolePermission(role_id=role.id, permission_id=permission.id, is_deleted=True, updated_at=EXPIRED)
+        db.add(grant)
+        db.commit()
+        return role.id, grant.id
+
+
+def test_archive_and_restore_round_trip(tenant, deleted_role):
+    role_id, grant_id = deleted_role
+    [user_id] = tenant.add_users(1, is_deleted=True, updated_at=EXPIRED)
+    before = {table: locate(table, row_id)[1] for table, row_id in (
+        ("users", user_id), ("user_roles", role_id), ("user_role_permissions", grant_id))}
+
+    with SessionLocal() as db:
+        archive_deleted_rows(db, RETENTION)
+    for table, row in before.items():
+        where, archived = locate(table, row["id"])
+        assert where == "archive"
+        assert archived["archived_at"] is not None
+
+    with SessionLocal() as db:
+        # Referenced rows first: the role before its grant
+        for table in ("user_roles", "user_role_permissions", "users"):
+            assert restore_archived_rows(db, table, [before[table]["id"]]) == 1
+    for table, row in before.items():
+        assert locate(table, row["id"]) == ("hot", row)
+
+
+def test_referenced_role_stays_hot(tenant):
+    with SessionLocal() as db:
+        role = UserRole(name="still used", department_id=tenant.department_id, is_deleted=True, updated_at=EXPIRED)
+        db.add(role)
+        db.commit()
+        role_id = role.id
+    tenant.add_users(1, role_id=role_id)
+
+    with SessionLocal() as db:
+        archive_deleted_rows(db, RETENTION)
+
+    assert locate("user_roles", role_id)[0] == "hot"
@@ -0,0 +1,49 @@
+"""
+The count= modes of the list endpoints: exact always counts, none skips the count,
+and cached reuses a recent count until the next write through the API.
+"""
+
+
+def pagination(client, tenant, **params) -> dict:
+    body = client.get("/api/v1/users", headers=tenant.headers, params=params).json()
+    assert body["status"] == 200, body
+    return body["data"]["pagination"]
+
+
+def test_exact_count(client, tenant):
+    tenant.add_users(4)
+
+    page = pagination(client, tenant, limit=2, count="exact")
+    assert page["total_records"] == 5
+    assert page["total_records_exact"] is True
+    assert page["total_pages"] == 3
+
+
+def test_count_none_still_reports_next_page(client, tenant):
+    tenant.add_users(4)
+
+    page = pagination(client, tenant, limit=2, count="none")
+    assert page["total_records"] is None
+    assert page["total_pages"] is None
+    assert page["next_page_url"] is not None
+
+
+def test_cached_count_until_an_api_write(client, tenant):
+    user_ids = tenant.add_users(2)
+    assert pagination(client, tenant, count="cached")["total_records"] == 3
+
+    # Rows written behind the API's back are not seen until the cache entry expires
+    tenant.add_users(1)
+    page = pagination(client, tenant, count="cached")
+    assert page["total_records"] == 3
+    assert page["total_records_exact"] is False
+    assert pagination(client, tenant, count="exact")["total_records"] == 4
+
+    client.delete(f"/api/v1/users/{user_ids[0]}", headers=tenant.headers)
+    page = pagination(client, tenant, count="cached")
+    assert page["total_records"] == 3
+    assert page["total_records_exact"] is True
+
+
+def test_unknown_count_mode_rejected(client, tenant):
+    assert client.get("/api/v1/users", headers=tenant.headers, params={"count": "estimated"}).status_code == 422
@@ -0,0 +1,102 @@
+"""
+Conditional GETs on role, permission and department reads: a matching If-None-Match
+gets an empty 304, and any write behind the response changes the ETag.
+"""
+import uuid
+
+import pytest
+
+from configs.database import SessionLocal
+
+from src.permission.models import Module, Permission
+from src.user.models import UserRole
+
+
+def etag_of(client, tenant, path: str) -> str:
+    r = client.get(path, headers=tenant.headers)
+    assert r.status_code == 200 and r.json()["status"] == 200, r.text
+    return r.headers["ETag"]
+
+
+def conditional_get(client, tenant, path: str, etag: str):
+    return client.get(path, headers={**tenant.headers, "If-None-Match": etag})
+
+
+@pytest.fixture
+def role_id(tenant):
+    with SessionLocal() as db:
+        role = UserRole(name=f"etag {uuid.uuid4().hex[:8]}", department_id=tenant.department_id)
+        db.add(role)
+        db.commit()
+        return role.id
+
+
+def test_role_not_modified_until_updated(client, tenant, role_id):
+    path = f"/api/v1/roles/{role_id}"
+    etag = etag_of(client, tenant, path)
+
+    r = conditional_get(client, tenant, path, etag)
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["ETag"] == etag
+
+    body = client.put(path, headers=tenant.headers, json={"name": f"renamed {role_id}"}).json()
+    assert body["status"] == 200, body
+
+    r = conditional_get(client, tenant, path, etag)
+    assert r.status_code == 200
+    assert r.json()["data"]["name"] == f"renamed {role_id}"
+    assert r.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("header", [
+    "{etag}",
+    "{strong}",
+    '"other", {etag}',
+    "*",
+])
+def test_if_none_match_forms(client, tenant, role_id, header):
+    path = f"/api/v1/roles/{role_id}"
+    etag = etag_of(client, tenant, path)
+
+    header = header.format(etag=etag, strong=etag.removeprefix("W/"))
+    assert conditional_get(client, tenant, path, header).status_code == 304
+
+
+def test_stale_etag_gets_full_response(client, tenant, role_id):
+    r = conditional_get(client, tenant, f"/api/v1/roles/{role_id}", 'W/"stale"')
+
+    assert r.status_code == 200
+    assert r.json()["data"]["id"] == role_id
+
+
+def test_permission_catalog_etag_changes_on_rename(client, tenant):
+    tag = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        module = Module(name=f"etag {tag}")
+        db.add(module)
+        db.flush()
+        permission = Permission(name=f"etag_{tag}", module_id=module.id)
+        db.add(permission)
+        db.commit()
+        permission_id, module_id = permission.id, module.id
+
+    etag = etag_of(client, tenant, "/api/v1/permissions")
+    assert conditional_get(client, tenant, "/api/v1/permissions", etag).status_code == 304
+
+    body = client.put(f"/api/v1/permissions/{permission_id}", headers=tenant.headers,
+                      json={"name": f"etag_renamed_{tag}", "module_id": module_id}).json()
+    assert body["status"] == 200, body
+
+    assert conditional_get(client, tenant, "/api/v1/permissions", etag).status_code == 200
+
+
+def test_department_list_etag_changes_on_update(client, tenant):
+    etag = etag_of(client, tenant, "/api/v1/departments")
+    assert conditional_get(client, tenant, "/api/v1/departments", etag).status_code == 304
+
+    body = client.put(f"/api/v1/departments/{tenant.department_id}", headers=tenant.headers,
+                      json={"name": f"renamed {tenant.department_id}"}).json()
+    assert body["status"] == 200, body
+
+    assert conditional_get(client, tenant, "/api/v1/departments", etag).status_code == 200
@@ -0,0 +1,58 @@
+"""
+Sparse fieldsets: fields= limits each item to the named fields on list, single and
+batch reads, and a field the resource does not have is a 400.
+"""
+import pytest
+
+from configs.database import SessionLocal
+
+from src.user.models import UserRole
+
+
+def get_data(client, tenant, path: str, **params):
+    body = client.get(path, headers=tenant.headers, params=params).json()
+    assert body["status"] == 200, body
+    return body["data"]
+
+
+def test_user_list_fields(client, tenant):
+    tenant.add_users(2)
+
+    users = get_data(client, tenant, "/api/v1/users", fields="id,name")["users"]
+    assert len(users) == 3
+    assert all(set(user) == {"id", "name"} for user in users)
+
+
+def test_user_fields_with_relationship(client, tenant):
+    [user_id] = tenant.add_users(1)
+
+    user = get_data(client, tenant, f"/api/v1/users/{user_id}", fields="email,department")
+    assert set(user) == {"email", "department"}
+    assert user["department"]["id"] == tenant.department_id
+
+
+def test_role_fields_skip_permissions(client, tenant):
+    with SessionLocal() as db:
+        role = UserRole(name="sparse", department_id=tenant.department_id)
+        db.add(role)
+        db.commit()
+        role_id = role.id
+
+    assert get_data(client, tenant, f"/api/v1/roles/{role_id}", fields="id,name") == {"id": role_id, "name": "sparse"}
+
+    body = client.post("/api/v1/roles/batch-get", headers=tenant.headers, params={"fields": "name"},
+                       json={"ids": [role_id]}).json()
+    assert body["data"]["roles"] == [{"name": "sparse"}]
+
+
+def test_no_fields_returns_full_items(client, tenant):
+    user = get_data(client, tenant, f"/api/v1/users/{tenant.user_id}")
+    assert {"id", "name", "email", "phone", "role", "department"} <= set(user)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/users", "/api/v1/roles", "/api/v1/departments"])
+def test_unknown_field_rejected(client, tenant, path):
+    body = client.get(path, headers=tenant.headers, params={"fields": "id,password"}).json()
+
+    assert body["status"] == 400
+    assert body["message"] == "Unknown fields: password"
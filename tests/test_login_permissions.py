@@ -0,0 +1,56 @@
+"""
+The login payload lists a role's active grants, grouped by module, from the permission catalog.
+"""
+import asyncio
+
+import pytest
+
+from configs.database import AsyncSessionLocal, SessionLocal
+from src.auth.services import get_user_permissions
+from src.permission.services import permission_catalog
+
+from src.department.models import Department
+from src.permission.models import Module, Permission, RolePermission
+from src.user.models import User, UserRole
+
+pytestmark = pytest.mark.usefixtures("schema")
+
+
+@pytest.fixture
+def role_id():
+    with SessionLocal() as db:
+        department = Department(name="login permissions")
+        users, roles = Module(name="login_users"), Module(name="login_roles")
+        db.add_all([department, users, roles])
+        db.flush()
+        role = UserRole(name="login role", department_id=department.id)
+        list_user = Permission(name="login_list_user", module_id=users.id)
+        create_user = Permission(name="login_create_user", module_id=users.id)
+        list_role = Permission(name="login_list_role", module_id=roles.id)
+        db.add_all([role, list_user, create_user, list_role])
+        db.flush()
+        db.add_all([
+            RolePermission(role_id=role.id, permission_id=list_user.id),
+            RolePermission(role_id=role.id, permission_id=create_user.id, is_deleted=True),
+            RolePermission(role_id=role.id, permission_id=list_role.id, is_deleted=True),
+        ])
+        db.commit()
+        permission_catalog.invalidate()
+        return role.id
+
+
+def login_permissions(role_id):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await get_user_permissions(db, User(role_id=role_id))
+    return asyncio.run(run())
+
+
+def test_login_permissions_omit_soft_deleted_grants(role_id):
+    assert login_permissions(role_id) == [
+        {"module_name": "login_users", "permissions": ["login_list_user"]},
+    ]
+
+
+def test_login_permissions_without_role():
+    assert login_permissions(None) == []
@@ -0,0 +1,47 @@
+"""
+Keyset pagination on the list endpoints: following next_cursor visits every row once,
+in id order, and a cursor the server did not issue is rejected.
+"""
+import pytest
+
+from src.helpers import encode_cursor
+
+
+def follow_cursor(client, headers, path: str, limit: int) -> list:
+    ids, cursor = [], ""
+    while cursor is not None:
+        body = client.get(path, headers=headers, params={"cursor": cursor, "limit": limit}).json()
+        assert body["status"] == 200, body
+        ids.extend(user["id"] for user in body["data"]["users"])
+        cursor = body["data"]["pagination"]["next_cursor"]
+    return ids
+
+
+def test_cursor_round_trip_visits_every_user_once(client, tenant):
+    user_ids = tenant.add_users(5)
+
+    assert follow_cursor(client, tenant.headers, "/api/v1/users", limit=2) == [tenant.user_id, *user_ids]
+
+
+def test_cursor_skips_rows_deleted_between_pages(client, tenant):
+    user_ids = tenant.add_users(4)
+    first = client.get("/api/v1/users", headers=tenant.headers, params={"cursor": "", "limit": 2}).json()
+    client.delete(f"/api/v1/users/{user_ids[1]}", headers=tenant.headers)
+
+    rest = client.get("/api/v1/users", headers=tenant.headers,
+                      params={"cursor": first["data"]["pagination"]["next_cursor"], "limit": 10}).json()
+    assert [user["id"] for user in rest["data"]["users"]] == [user_ids[2], user_ids[3]]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    encode_cursor(["1"]),
+    encode_cursor([1, 2]),
+    encode_cursor([2 ** 40]),
+    encode_cursor({"id": 1}),
+])
+def test_malformed_cursor_rejected(client, tenant, cursor):
+    body = client.get("/api/v1/users", headers=tenant.headers, params={"cursor": cursor}).json()
+
+    assert body["status"] == 400
+    assert body["message"] == "Invalid cursor"
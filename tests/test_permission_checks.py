@@ -0,0 +1,67 @@
+"""
+Authorization checks and login payloads read the same permission catalog snapshot,
+so a grant change reaches both at once.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import update
+
+from configs.database import AsyncSessionLocal, SessionLocal
+from src.auth.dependencies import has_role_permission
+from src.auth.exceptions import UnauthorizedException
+from src.auth.services import get_user_permissions, load_principal
+from src.permission.services import permission_catalog
+
+from src.department.models import Department
+from src.permission.models import Module, Permission, RolePermission
+from src.user.models import User, UserRole
+
+pytestmark = pytest.mark.usefixtures("schema")
+
+
+@pytest.fixture
+def user_id():
+    with SessionLocal() as db:
+        department = Department(name="permission checks")
+        module = Module(name="checks")
+        db.add_all([department, module])
+        db.flush()
+        role = UserRole(name="checks role", department_id=department.id)
+        permission = Permission(name="checks_read", module_id=module.id)
+        db.add_all([role, permission])
+        db.flush()
+        db.add(RolePermission(role_id=role.id, permission_id=permission.id))
+        user = User(name="checker", email="checker@x", phone="5550001", password="x",
+                    role_id=role.id, department_id=department.id)
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def check(user_id):
+    """
+    Whether `checks_read` is granted, and the login payload, from one fresh request.
+    """
+    async def run():
+        async with AsyncSessionLocal() as db:
+            principal = await load_principal(db, user_id)
+            try:
+                await has_role_permission(["checks_read"])(principal=principal, db=db)
+                allowed = True
+            except UnauthorizedException:
+                allowed = False
+            return allowed, await get_user_permissions(db, principal.user)
+    return asyncio.run(run())
+
+
+def test_grant_change_reaches_checks_and_login_payload_together(user_id):
+    permission_catalog.invalidate()
+    assert check(user_id) == (True, [{"module_name": "checks", "permissions": ["checks_read"]}])
+
+    with SessionLocal() as db:
+        role_id = db.get(User, user_id).role_id
+        db.execute(update(RolePermission).where(RolePermission.role_id == role_id).values(is_deleted=True))
+        db.commit()
+    permission_catalog.invalidate()
+    assert check(user_id) == (False, [])
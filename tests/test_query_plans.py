@@ -0,0 +1,85 @@
+"""
+The hot queries must be answered from an index. Builds the schema with the Alembic
+migrations and checks each query's EXPLAIN QUERY PLAN for a full table scan.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from configs.database import engine
+from src.etag import max_updated_at
+from src.auth.reaper import reapable_tokens_filter
+from src.auth.revocation import utcnow
+
+from src.auth.models import ApiKey, UserToken
+from src.department.models import Department
+from src.permission.models import Module, Permission, RolePermission
+from src.user.models import User, UserRole
+
+ACCESS_TOKEN_LIFETIME = timedelta(minutes=30)
+
+pytestmark = pytest.mark.usefixtures("schema")
+
+
+HOT_QUERIES = {
+    # users(department_id, is_deleted)
+    "user list": User.select_active().where(User.department_id == 1).order_by(User.id),
+    "user get": User.select_active().where(User.id == 1, User.department_id == 1),
+    # user_roles(department_id, name, is_deleted)
+    "role list": UserRole.select_active().where(UserRole.department_id == 1).order_by(UserRole.id),
+    "role name check": select(UserRole).where(
+        UserRole.name == "admin", UserRole.department_id == 1, UserRole.is_deleted == False),
+    # user_role_permissions(role_id, is_deleted, permission_id)
+    "role permission set": select(Permission.id, Permission.name)
+        .join(RolePermission, Permission.id == RolePermission.permission_id)
+        .where(RolePermission.role_id == 1, RolePermission.is_deleted == False),
+    "role permission diff": select(
+        RolePermission.id, RolePermission.permission_id, RolePermission.is_deleted)
+        .where(RolePermission.role_id == 1),
+    "role permissions of roles": select(RolePermission.role_id, RolePermission.permission_id)
+        .where(RolePermission.role_id.in_([1, 2, 3]), RolePermission.is_deleted == False),
+    # permissions(module_id, is_deleted)
+    "module permissions": Permission.select_active().where(Permission.module_id == 1),
+    # user_roles(updated_at)
+    "role version sync": select(UserRole.id, UserRole.updated_at)
+        .where(UserRole.updated_at >= datetime.now() - timedelta(seconds=5)),
+    # user_tokens(is_blacklisted, updated_at) and user_tokens(expires_at)
+    "revocation first sync": select(UserToken.jti, UserToken.expires_at).where(
+        UserToken.is_blacklisted == True, UserToken.expires_at > utcnow() - ACCESS_TOKEN_LIFETIME),
+    "revocation sync": select(UserToken.jti, UserToken.expires_at).where(
+        UserToken.is_blacklisted == True, UserToken.updated_at >= datetime.now() - timedelta(seconds=5)),
+    "token reaper batch": select(UserToken.id)
+        .where(reapable_tokens_filter(ACCESS_TOKEN_LIFETIME)).limit(1000),
+    "refresh token": select(UserToken).where(UserToken.jti == "jti"),
+    "api key": select(ApiKey).where(
+        ApiKey.key_hash == "hash", ApiKey.is_active == True, ApiKey.is_deleted == False),
+    # updated_at indexes behind the ETags and the permission catalog version
+    "permission catalog version": select(
+        max_updated_at(Permission), max_updated_at(Module), max_updated_at(RolePermission)),
+    "role detail version": select(
+        max_updated_at(UserRole, UserRole.id == 1),
+        max_updated_at(RolePermission, RolePermission.role_id == 1)),
+    "department list version": select(max_updated_at(Department)),
+}
+
+
+def query_plan(statement) -> list:
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}",
+            tuple(params[name] for name in compiled.positiontup),
+        ).all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_an_index(name):
+    plan = query_plan(HOT_QUERIES[name])
+    full_scans = [
+        step for step in plan
+        if step.startswith("SCAN ") and "INDEX" not in step and step != "SCAN CONSTANT ROW"
+    ]
+    assert not full_scans, f"{name}: {plan}"
@@ -0,0 +1,60 @@
+"""
+Blacklisted access tokens are rejected from the in-memory revocation store, including
+right after a restart while the store's first sync is still loading.
+"""
+import uuid
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from configs.database import AsyncSessionLocal, SessionLocal
+from src.auth import utils
+from src.auth.exceptions import JWTException
+from src.auth.revocation import RevocationStore
+from src.auth.utils import create_access_token, decode_access_token
+
+from src.auth.models import UserToken
+
+pytestmark = pytest.mark.usefixtures("schema")
+
+
+def revoked_token() -> str:
+    jti = str(uuid.uuid4())
+    with SessionLocal() as db:
+        db.add(UserToken(
+            token=f"refresh-{jti}", jti=jti, user_id=1, is_blacklisted=True,
+            expires_at=datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1),
+        ))
+        db.commit()
+    return create_access_token(data={"user_id": 1, "phone": "000"}, jti=jti)
+
+
+def test_revoked_token_rejected_during_first_sync(monkeypatch):
+    token = revoked_token()
+    store = RevocationStore(access_token_lifetime=timedelta(minutes=30))
+    monkeypatch.setattr(utils, "revocation_store", store)
+
+    async def run():
+        async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+            first_sync = asyncio.create_task(store.sync(first))
+            await asyncio.sleep(0)
+            assert store._lock.locked(), "the first sync should still be loading"
+            with pytest.raises(JWTException) as rejected:
+                await decode_access_token(second, token)
+            await first_sync
+            return rejected.value
+
+    assert "blacklisted" in asyncio.run(run()).message
+
+
+def test_revoked_token_rejected_after_sync(monkeypatch):
+    token = revoked_token()
+    monkeypatch.setattr(utils, "revocation_store", RevocationStore(access_token_lifetime=timedelta(minutes=30)))
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await decode_access_token(db, token)
+
+    with pytest.raises(JWTException):
+        asyncio.run(run())
@@ -0,0 +1,90 @@
+"""
+POST /users/bulk imports the valid rows of a file and reports every other row by its
+line number, including duplicates within the file and accounts that already exist.
+"""
+import json
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from configs.database import SessionLocal
+from src.user.services import shutdown_hash_executor
+
+from src.user.models import User, UserRole
+
+
+@pytest.fixture(autouse=True, scope="module")
+def hash_executor():
+    yield
+    shutdown_hash_executor()
+
+
+@pytest.fixture
+def role_id(tenant):
+    with SessionLocal() as db:
+        role = UserRole(name="imported", department_id=tenant.department_id)
+        db.add(role)
+        db.commit()
+        return role.id
+
+
+def account(role_id: int, **values) -> dict:
+    tag = uuid.uuid4().hex[:12]
+    return {"name": f"imported {tag}", "email": f"{tag}@test", "phone": tag,
+            "password": "secret1", "role_id": role_id, **values}
+
+
+def bulk_import(client, tenant, body: str, content_type: str = "application/x-ndjson") -> dict:
+    body = client.post("/api/v1/users/bulk", content=body.encode(),
+                       headers={**tenant.headers, "Content-Type": content_type}).json()
+    assert body["status"] == 200, body
+    return body["data"]
+
+
+def department_users(tenant) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).where(
+            User.department_id == tenant.department_id, User.is_deleted == False))
+
+
+def test_duplicate_rows_reported_by_line(client, tenant, role_id):
+    first, second = account(role_id), account(role_id)
+    lines = [
+        json.dumps(first),
+        "",
+        json.dumps(account(role_id, phone=first["phone"])),
+        json.dumps(second),
+        json.dumps(account(role_id, email=second["email"])),
+    ]
+
+    result = bulk_import(client, tenant, "\n".join(lines) + "\n")
+
+    assert result["created"] == 2
+    assert result["errors"] == [
+        {"line": 3, "errors": ["Duplicate email or phone in the import"]},
+        {"line": 5, "errors": ["Duplicate email or phone in the import"]},
+    ]
+    assert department_users(tenant) == 3
+
+
+def test_existing_accounts_and_bad_rows_reported_by_line(client, tenant, role_id):
+    existing = account(role_id)
+    bulk_import(client, tenant, json.dumps(existing))
+    lines = [
+        "email,phone,name,password,role_id",
+        f"{existing['email']},{uuid.uuid4().hex[:12]},taken,secret1,{role_id}",
+        f"new@{uuid.uuid4().hex[:8]},{uuid.uuid4().hex[:12]},fresh,secret1,{role_id}",
+        "only,three,columns",
+        f"other@{uuid.uuid4().hex[:8]},{uuid.uuid4().hex[:12]},no role,secret1,999999",
+    ]
+
+    result = bulk_import(client, tenant, "\n".join(lines), content_type="text/csv")
+
+    assert result["created"] == 1
+    assert result["failed"] == 3
+    assert result["errors"] == [
+        {"line": 2, "errors": ["Account already exists with the email or phone"]},
+        {"line": 4, "errors": ["Expected 5 columns, got 3"]},
+        {"line": 5, "errors": ["Role not found"]},
+    ]